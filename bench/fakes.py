@@ -0,0 +1,342 @@
+# 벤치마크용 외부 서비스 대역
+# Serp API, Yahoo 검색, YouTube Data API, youtube-transcript-api, Apify, Gemini, yfinance를
+# 같은 인터페이스의 가짜 객체로 바꾸고, 고정 데이터(fixtures)를 지연 시간/오류를 주입해 돌려줍니다.
+import hashlib
+import json
+import random
+import threading
+import time
+import types
+from collections import Counter
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+SERVICES = ('serpapi', 'yahoo', 'youtube', 'transcript', 'apify', 'gemini', 'yfinance')
+
+
+# 서비스별 지연 시간과 오류 주입
+class FaultInjector:
+    # latency: {서비스: 평균 지연(초)}, error_rate: {서비스: 오류 확률}, jitter: 지연 시간 변동 비율
+    def __init__(self, latency=None, error_rate=None, jitter=0.3, seed=0):
+        self.latency = dict(latency or {})
+        self.error_rate = dict(error_rate or {})
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = Counter()
+        self.errors = Counter()
+
+    # 호출 기록 후 지연, 오류를 주입해야 하면 True
+    def enter(self, service):
+        with self._lock:
+            self.calls[service] += 1
+            delay = self.latency.get(service, 0) * self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+            fail = self._rng.random() < self.error_rate.get(service, 0)
+            if fail:
+                self.errors[service] += 1
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+
+# 기본 고정 데이터 (fixtures 파일로 일부 또는 전체를 바꿀 수 있음)
+def default_fixtures():
+    topics = ["반도체 수출 회복", "기준금리 동결", "원달러 환율 상승", "비트코인 ETF 자금 유입", "아파트 청약 경쟁률",
+              "국채 금리 하락", "코스피 외국인 순매수", "유가 급등", "엔화 약세", "소비자물가 둔화"]
+    news = [
+        {
+            'title': f"{topic} {variant}",
+            'source': f"언론사{i}",
+            'snippet': f"{topic} 관련 소식입니다. 시장에서는 {topic}이 당분간 이어질 것으로 보고 있습니다.",
+            'link': f"https://news.example.com/{i}",
+        }
+        for i, (topic, variant) in enumerate((topic, variant) for variant in ("", "(종합)", "[속보]") for topic in topics)
+    ]
+    videos = [
+        {
+            'id': f"vid{i:03d}",
+            'title': f"{topics[i % len(topics)]} 전망 분석 {i}",
+            'channel': f"채널{i % 4}",
+            'duration': f"PT{10 + i}M{i % 60}S",
+            'views': 1000 * (i + 1),
+        }
+        for i in range(20)
+    ]
+    return {
+        'news': news,
+        'videos': videos,
+        'comments': [f"좋은 분석 감사합니다 {i}" for i in range(30)],
+        'transcript_sentences': [f"오늘은 {topic}에 대해 이야기해 보겠습니다." for topic in topics] * 40,
+        'report_chars': 2000,
+    }
+
+
+def load_fixtures(path=None):
+    fixtures = default_fixtures()
+    if path:
+        with open(path, encoding='utf-8') as f:
+            fixtures.update(json.load(f))
+    return fixtures
+
+
+def _stable_int(text):
+    return int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:8], 16)
+
+
+# requests.Session.get 대역 (serpapi.com, Yahoo 검색)
+class FakeHTTPResponse:
+    def __init__(self, data, status_code=200):
+        self._data = data
+        self.status_code = status_code
+        self.headers = {}
+        self.content = json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+
+def make_session_get(fixtures, faults):
+    def get(session, url, params=None, **kwargs):
+        params = params or {}
+        if 'serpapi.com' in url:
+            if faults.enter('serpapi'):
+                return FakeHTTPResponse({'error': 'Internal error'}, 503)
+            start = int(params.get('start', 0))
+            num = int(params.get('num', 10))
+            # 검색어별로 기사 순서를 바꿔 도메인마다 다른 결과가 나오도록 함
+            offset = _stable_int(params.get('q', '')) % len(fixtures['news'])
+            articles = fixtures['news'][offset:] + fixtures['news'][:offset]
+            return FakeHTTPResponse({'news_results': articles[start:start + num]})
+        if 'finance.yahoo.com' in url:
+            if faults.enter('yahoo'):
+                return FakeHTTPResponse({'error': 'Internal error'}, 500)
+            query = params.get('q', '')
+            symbol = query.upper() if query.isascii() else f"{_stable_int(query) % 1000000:06d}.KS"
+            return FakeHTTPResponse({'quotes': [{'symbol': symbol, 'longname': query}]})
+        raise ValueError(f"벤치마크에서 지원하지 않는 주소: {url}")
+    return get
+
+
+# googleapiclient.discovery.build 대역
+class _FakeRequest:
+    def __init__(self, faults, response):
+        self._faults = faults
+        self._response = response
+
+    def execute(self, **kwargs):
+        if self._faults.enter('youtube'):
+            from googleapiclient.errors import HttpError
+            raise HttpError(types.SimpleNamespace(status=500, reason='backendError'), b'{"error": "backendError"}')
+        return self._response()
+
+
+class FakeYouTube:
+    def __init__(self, fixtures, faults):
+        self.fixtures = fixtures
+        self.faults = faults
+
+    def _video_items(self, ids=None):
+        videos = self.fixtures['videos']
+        if ids is not None:
+            videos = [video for video in videos if video['id'] in ids]
+        return videos
+
+    def search(self):
+        def list_(q='', maxResults=10, **kwargs):
+            offset = _stable_int(q) % len(self.fixtures['videos'])
+            videos = (self.fixtures['videos'][offset:] + self.fixtures['videos'][:offset])[:maxResults]
+            return _FakeRequest(self.faults, lambda: {
+                'items': [{
+                    'id': {'videoId': video['id']},
+                    'snippet': {
+                        'title': video['title'],
+                        'channelTitle': video['channel'],
+                        'description': f"{video['title']} 영상 설명",
+                        'thumbnails': {'medium': {'url': f"https://img.example.com/{video['id']}.jpg"}},
+                    },
+                } for video in videos],
+                'pageInfo': {'totalResults': len(videos)},
+            })
+        return types.SimpleNamespace(list=list_)
+
+    def videos(self):
+        def list_(id='', **kwargs):
+            ids = set(id.split(','))
+            return _FakeRequest(self.faults, lambda: {
+                'items': [{
+                    'id': video['id'],
+                    'snippet': {'description': f"{video['title']} 영상 설명"},
+                    'contentDetails': {'duration': video['duration'], 'caption': 'true'},
+                    'statistics': {'viewCount': str(video['views'])},
+                } for video in self._video_items(ids)]
+            })
+        return types.SimpleNamespace(list=list_)
+
+    def commentThreads(self):
+        def list_(maxResults=30, **kwargs):
+            return _FakeRequest(self.faults, lambda: {
+                'items': [
+                    {'snippet': {'topLevelComment': {'snippet': {'textDisplay': comment}}}}
+                    for comment in self.fixtures['comments'][:maxResults]
+                ]
+            })
+        return types.SimpleNamespace(list=list_)
+
+
+# youtube-transcript-api 대역
+def make_transcript_api(fixtures, faults):
+    class FakeYouTubeTranscriptApi:
+        @staticmethod
+        def get_transcript(video_id, languages=None):
+            if faults.enter('transcript'):
+                raise ConnectionError("transcript fetch failed")
+            return [{'text': sentence} for sentence in fixtures['transcript_sentences']]
+    return FakeYouTubeTranscriptApi
+
+
+# ApifyClient 대역 (실행은 즉시 종료, 데이터셋에 자막 한 건)
+class FakeApifyClient:
+    def __init__(self, fixtures, faults):
+        self.fixtures = fixtures
+        self.faults = faults
+
+    def actor(self, actor_id):
+        def start(run_input=None):
+            status = 'FAILED' if self.faults.enter('apify') else 'SUCCEEDED'
+            return {'id': 'run', 'status': status, 'defaultDatasetId': 'dataset'}
+        return types.SimpleNamespace(start=start)
+
+    def run(self, run_id):
+        return types.SimpleNamespace(get=lambda: {'id': run_id, 'status': 'SUCCEEDED', 'defaultDatasetId': 'dataset'},
+                                     abort=lambda: None)
+
+    def dataset(self, dataset_id):
+        transcript = ' '.join(self.fixtures['transcript_sentences'])
+        return types.SimpleNamespace(iterate_items=lambda: iter([{'transcript': transcript}]))
+
+
+# google.generativeai.GenerativeModel 대역 (프롬프트 길이에 맞춘 사용량 정보 포함)
+def make_generative_model(fixtures, faults):
+    from google.api_core import exceptions as google_exceptions
+
+    def response(text, prompt_tokens, final=True):
+        usage = types.SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=len(text) // 2) if final else None
+        return types.SimpleNamespace(
+            text=text,
+            parts=[types.SimpleNamespace(text=text)],
+            candidates=[types.SimpleNamespace(
+                content=types.SimpleNamespace(parts=[types.SimpleNamespace(text=text)]),
+                finish_reason=types.SimpleNamespace(name='STOP'),
+            )],
+            prompt_feedback=None,
+            usage_metadata=usage,
+        )
+
+    class FakeStream(list):
+        prompt_feedback = None
+        usage_metadata = None
+
+    class FakeGenerativeModel:
+        def __init__(self, model_name, **kwargs):
+            self.model_name = model_name
+
+        def generate_content(self, prompt, stream=False, **kwargs):
+            if faults.enter('gemini'):
+                raise google_exceptions.ResourceExhausted("429 Resource has been exhausted")
+            prompt_tokens = len(prompt) // 2
+            text = "# 분석 보고서\n\n" + ("요약 내용입니다. " * (fixtures['report_chars'] // 9))
+            if not stream:
+                return response(text, prompt_tokens)
+            chunks = [text[i:i + 200] for i in range(0, len(text), 200)]
+            stream_response = FakeStream(response(chunk, prompt_tokens, final=False) for chunk in chunks)
+            stream_response.usage_metadata = types.SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=len(text) // 2)
+            return stream_response
+
+    return FakeGenerativeModel
+
+
+# yfinance 대역 (종목별로 다른 값의 연간 재무제표 4개년, 주가)
+def make_yfinance(faults):
+    periods = pd.to_datetime(["2024-12-31", "2023-12-31", "2022-12-31", "2021-12-31"])
+
+    def statement(symbol, rows):
+        scale = 1 + _stable_int(symbol) % 50 / 10
+        return pd.DataFrame({
+            period: [value * scale * (1 - 0.08 * j) for value in rows.values()]
+            for j, period in enumerate(periods)
+        }, index=list(rows))
+
+    class FakeTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def _enter(self):
+            if faults.enter('yfinance'):
+                raise ConnectionError("yfinance fetch failed")
+
+        @property
+        def financials(self):
+            self._enter()
+            return statement(self.symbol, {'Total Revenue': 1e11, 'Gross Profit': 4e10, 'Operating Income': 3e10, 'Net Income': 2e10})
+
+        @property
+        def balance_sheet(self):
+            self._enter()
+            return statement(self.symbol, {'Total Assets': 3e11, 'Total Liabilities Net Minority Interest': 1e11,
+                                           'Stockholders Equity': 2e11, 'Current Assets': 1e11, 'Current Liabilities': 5e10,
+                                           'Total Debt': 4e10, 'Cash And Cash Equivalents': 3e10})
+
+        @property
+        def cashflow(self):
+            self._enter()
+            return statement(self.symbol, {'Operating Cash Flow': 3e10, 'Capital Expenditure': -1e10, 'Free Cash Flow': 2e10})
+
+        @property
+        def info(self):
+            self._enter()
+            return {'longName': f"{self.symbol} Corp", 'currency': 'KRW' if self.symbol.endswith('.KS') else 'USD'}
+
+    def download(symbols, period='1y', **kwargs):
+        faults.enter('yfinance')
+        symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+        dates = pd.bdate_range(end=pd.Timestamp('2025-01-01'), periods=250)
+        rng = np.random.default_rng(len(symbols))
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(dates), len(symbols))), axis=0))
+        columns = pd.MultiIndex.from_product([['Close'], symbols], names=['Price', 'Ticker'])
+        return pd.DataFrame(closes, index=dates, columns=columns)
+
+    return FakeTicker, download
+
+
+# 모든 외부 서비스를 대역으로 교체하는 patch 목록 (AIsenet.py 실행 전에 시작)
+# 앱 모듈은 외부 라이브러리를 사용할 때 불러오므로 라이브러리 모듈의 속성만 교체하면 됨
+def install(fixtures, faults):
+    import apify_client
+    import googleapiclient.discovery
+    import google.generativeai as genai
+    import requests
+    import yfinance
+    import youtube_transcript_api
+
+    fake_youtube = FakeYouTube(fixtures, faults)
+    fake_ticker, fake_download = make_yfinance(faults)
+    patches = [
+        mock.patch.object(requests.Session, 'get', make_session_get(fixtures, faults)),
+        mock.patch.object(googleapiclient.discovery, 'build', lambda *args, **kwargs: fake_youtube),
+        mock.patch.object(youtube_transcript_api, 'YouTubeTranscriptApi', make_transcript_api(fixtures, faults)),
+        mock.patch.object(apify_client, 'ApifyClient', lambda *args, **kwargs: FakeApifyClient(fixtures, faults)),
+        mock.patch.object(genai, 'GenerativeModel', make_generative_model(fixtures, faults)),
+        mock.patch.object(genai, 'configure', lambda **kwargs: None),
+        mock.patch.object(yfinance, 'Ticker', fake_ticker),
+        mock.patch.object(yfinance, 'download', fake_download),
+    ]
+    for patch in patches:
+        patch.start()
+    return patches
@@ -0,0 +1,240 @@
+# AIsenet 오프라인 벤치마크
+# 외부 서비스를 대역(bench/fakes.py)으로 바꾼 뒤 Streamlit AppTest로 여러 세션을 동시에 실행하고,
+# 흐름별 전체 지연 시간 분위수, 외부 서비스별 호출 수, 최대 메모리 사용량을 보고합니다.
+#
+# 사용 예:
+#   python bench/run.py --sessions 8 --rounds 2
+#   python bench/run.py --sessions 4 --latency gemini=1.5 serpapi=0.3 --error-rate gemini=0.1
+#   python bench/run.py --fixtures recorded.json --json result.json
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP_PATH = os.path.join(ROOT, "AIsenet.py")
+FLOWS = ('news', 'youtube_search', 'youtube_summary', 'financial')
+
+DOMAINS = ["주식", "부동산", "코인", "채권/금리/환율", "경제일반"]
+STOCKS = ["Apple Inc. (AAPL)", "Microsoft Corporation (MSFT)", "NVIDIA Corporation (NVDA)", "Tesla, Inc. (TSLA)"]
+
+SECRETS = {
+    "GOOGLE_AI_STUDIO_API_KEY": "bench",
+    "YOUTUBE_API_KEY1": "bench-yt-1",
+    "YOUTUBE_API_KEY2": "bench-yt-2",
+    "YOUTUBE_API_KEY3": "bench-yt-3",
+    "YOUTUBE_API_KEY4": "bench-yt-4",
+    "APIFY_API_KEY": "bench",
+    "SERP_API_KEY1": "bench-serp-1",
+    "SERP_API_KEY2": "bench-serp-2",
+    # 백그라운드 사전 계산은 측정 대상 흐름과 섞이지 않도록 끔
+    "NEWS_PRECOMPUTE_ENABLED": False,
+}
+
+
+# "이름=값" 목록을 dict로 변환
+def parse_assignments(items):
+    values = {}
+    for item in items or []:
+        name, _, value = item.partition('=')
+        values[name] = float(value)
+    return values
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+# AppTest는 한 번에 한 앱만 실행한다고 가정하고 프로세스 전역 상태를 실행마다 바꿨다가 되돌리므로,
+# 여러 세션을 스레드로 동시에 실행할 수 있도록 다음을 고정함
+# - st.secrets: 실행마다 교체하지 않도록 한 번만 설정 (AppTest.secrets는 사용하지 않음)
+# - Runtime 인스턴스: 다른 세션의 실행이 끝나며 지워도 마지막으로 만든 인스턴스를 계속 사용
+# - 스크립트 컴파일: 여러 스레드에서 동시에 ast.parse를 호출하면 SystemError가 나므로 순서대로 진행
+def allow_concurrent_app_tests(secrets):
+    import streamlit as st
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.runtime.secrets import Secrets
+
+    shared_secrets = Secrets()
+    shared_secrets._secrets = dict(secrets)
+    st.secrets = shared_secrets
+
+    last_runtime = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last_runtime[:] = [cls._instance]
+            return cls._instance
+        if last_runtime:
+            return last_runtime[0]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last_runtime))
+
+    get_bytecode = ScriptCache.get_bytecode
+    compile_lock = threading.Lock()
+
+    def locked_get_bytecode(self, script_path):
+        with compile_lock:
+            return get_bytecode(self, script_path)
+
+    ScriptCache.get_bytecode = locked_get_bytecode
+
+
+def click_search(app):
+    next(button for button in app.sidebar.button if button.label == "검색 실행").click().run()
+
+
+# 한 세션의 흐름 실행 (흐름별 소요 시간 기록, 예외가 나면 오류로 기록)
+def run_session(index, rounds, timeout, results, lock):
+    def timed(flow, action):
+        started = time.perf_counter()
+        error = None
+        try:
+            action()
+            summary = str(app.session_state['summary']) if 'summary' in app.session_state else ""
+            if app.exception:
+                error = str(app.exception[0].value)
+            elif "오류가 발생했습니다" in summary:
+                # 보고서 생성 실패는 예외 대신 오류 문구로 표시됨
+                error = summary[:200]
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        with lock:
+            results[flow].append((time.perf_counter() - started, error))
+
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    app.run()
+    domain = DOMAINS[index % len(DOMAINS)]
+    stock = STOCKS[index % len(STOCKS)]
+    for _ in range(rounds):
+        def news():
+            app.sidebar.radio(key="source").set_value("뉴스").run()
+            app.sidebar.selectbox(key="domain").set_value(domain).run()
+            click_search(app)
+
+        def youtube_search():
+            app.sidebar.radio(key="source").set_value("YouTube").run()
+            app.sidebar.selectbox(key="domain").set_value(domain).run()
+            click_search(app)
+
+        def youtube_summary():
+            button = next(button for button in app.button if button.key and button.key.startswith("summarize_vid"))
+            button.click().run()
+
+        def financial():
+            app.sidebar.radio(key="source").set_value("재무정보").run()
+            app.sidebar.radio(key="stock_input_method").set_value("목록에서 선택").run()
+            app.sidebar.selectbox(key="stock_selection").set_value(stock).run()
+            click_search(app)
+
+        timed('news', news)
+        timed('youtube_search', youtube_search)
+        timed('youtube_summary', youtube_summary)
+        timed('financial', financial)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AIsenet 오프라인 벤치마크")
+    parser.add_argument("--sessions", type=int, default=4, help="동시에 실행할 세션 수")
+    parser.add_argument("--rounds", type=int, default=2, help="세션별 반복 횟수 (2회차부터 캐시 효과 확인)")
+    parser.add_argument("--latency", nargs="*", metavar="SERVICE=SECONDS", help="서비스별 평균 지연 시간")
+    parser.add_argument("--error-rate", nargs="*", metavar="SERVICE=RATE", help="서비스별 오류 확률")
+    parser.add_argument("--fixtures", help="고정 데이터 JSON 파일 (기본 데이터에 덮어씀)")
+    parser.add_argument("--cache-dir", help="캐시 디렉터리 (기본값: 임시 디렉터리, 실행마다 비어 있음)")
+    parser.add_argument("--gemini-rpm", type=int, default=15, help="Gemini 분당 요청 수 한도 (디스패처 설정)")
+    parser.add_argument("--timeout", type=float, default=300, help="스크립트 실행 1회 제한 시간 (초)")
+    parser.add_argument("--trace-memory", action="store_true", help="tracemalloc으로 Python 힙 최대 사용량 측정 (지연 시간이 늘어남)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    # 캐시 경로는 모듈을 불러오기 전에 정해야 함
+    os.environ["AISENET_CACHE_DIR"] = args.cache_dir or tempfile.mkdtemp(prefix="aisenet-bench-")
+
+    from bench import fakes
+    from tracing import TRACER
+
+    latency = {
+        'serpapi': 0.3, 'yahoo': 0.2, 'youtube': 0.15, 'transcript': 0.8, 'apify': 5.0, 'gemini': 2.0, 'yfinance': 0.4,
+        **parse_assignments(args.latency),
+    }
+    faults = fakes.FaultInjector(latency=latency, error_rate=parse_assignments(args.error_rate))
+    fakes.install(fakes.load_fixtures(args.fixtures), faults)
+
+    allow_concurrent_app_tests(dict(SECRETS, GEMINI_REQUESTS_PER_MINUTE=args.gemini_rpm))
+    if args.trace_memory:
+        tracemalloc.start()
+    results = defaultdict(list)
+    lock = threading.Lock()
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=run_session, args=(i, args.rounds, args.timeout, results, lock), name=f"session-{i}")
+        for i in range(args.sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    peak_memory_mb = {
+        # 리눅스는 KB, macOS는 바이트 단위
+        'max_rss': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1),
+    }
+    if args.trace_memory:
+        peak_memory_mb['python_heap'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        tracemalloc.stop()
+
+    report = {
+        'sessions': args.sessions,
+        'rounds': args.rounds,
+        'elapsed_s': round(elapsed, 2),
+        'flows': {},
+        'service_calls': dict(faults.calls),
+        'injected_errors': dict(faults.errors),
+        'peak_memory_mb': peak_memory_mb,
+        'stages': TRACER.stats(),
+    }
+    for flow in FLOWS:
+        durations = [duration for duration, _ in results[flow]]
+        errors = [error for _, error in results[flow] if error]
+        if not durations:
+            continue
+        report['flows'][flow] = {
+            'count': len(durations),
+            'errors': len(errors),
+            'p50_s': round(percentile(durations, 0.5), 3),
+            'p95_s': round(percentile(durations, 0.95), 3),
+            'p99_s': round(percentile(durations, 0.99), 3),
+            'max_s': round(max(durations), 3),
+        }
+        if errors:
+            report['flows'][flow]['first_error'] = errors[0]
+
+    print(f"세션 {args.sessions}개 × {args.rounds}회, 전체 {report['elapsed_s']}초")
+    print(f"{'흐름':<18}{'횟수':>6}{'오류':>6}{'p50(s)':>10}{'p95(s)':>10}{'p99(s)':>10}{'max(s)':>10}")
+    for flow, stats in report['flows'].items():
+        print(f"{flow:<18}{stats['count']:>6}{stats['errors']:>6}{stats['p50_s']:>10}{stats['p95_s']:>10}{stats['p99_s']:>10}{stats['max_s']:>10}")
+    print("외부 서비스 호출 수:", json.dumps(report['service_calls'], ensure_ascii=False))
+    if report['injected_errors']:
+        print("주입된 오류 수:", json.dumps(report['injected_errors'], ensure_ascii=False))
+    print("최대 메모리(MB):", json.dumps(report['peak_memory_mb']))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
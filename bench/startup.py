@@ -0,0 +1,150 @@
+# AIsenet 시작/재실행 비용 점검
+# Streamlit은 위젯을 조작할 때마다 AIsenet.py를 처음부터 다시 실행하므로, 다음 세 가지를 측정해 예산과 비교합니다.
+# - 엔진 import/생성 시간 (새 프로세스) 및 이때 무거운 라이브러리를 불러오지 않는지
+# - 첫 화면 실행 시간 (새 프로세스, 엔진 생성 포함, 외부 서비스는 bench/fakes.py 대역 사용)
+# - 채널별 재실행 시간 (외부 서비스는 bench/fakes.py 대역 사용)
+# 예산을 넘으면 종료 코드 1로 끝나므로 배포 전 점검이나 CI에서 사용할 수 있습니다.
+#
+# 사용 예:
+#   python bench/startup.py
+#   python bench/startup.py --reruns 20 --rerun-budget 0.2 --json startup.json
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.run import SECRETS, APP_PATH, percentile
+
+# 엔진을 불러오고 만드는 것만으로는 불러오지 않아야 하는 라이브러리 (해당 기능을 처음 사용할 때 불러옴)
+LAZY_MODULES = (
+    "google.generativeai",
+    "apify_client",
+    "yfinance",
+    "pandas",
+    "plotly",
+    "googleapiclient.discovery",
+    "youtube_transcript_api",
+)
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import engine
+imported = time.perf_counter()
+engine.Engine(json.loads(sys.argv[1]), cache_dir=sys.argv[2])
+created = time.perf_counter()
+print(json.dumps({
+    'import_s': imported - started,
+    'create_s': created - imported,
+    'loaded': [name for name in json.loads(sys.argv[3]) if name in sys.modules],
+}))
+"""
+
+# 첫 화면 실행도 외부 서비스 대신 대역을 사용 (백그라운드 주요 종목 재무정보 저장이 실제 Yahoo Finance를 호출하지 않도록)
+COLD_START_SCRIPT = """
+import json, sys, time
+from bench import fakes
+fakes.install(fakes.load_fixtures(None), fakes.FaultInjector(latency={}))
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+app.secrets.update(json.loads(sys.argv[2]))
+started = time.perf_counter()
+app.run()
+print(json.dumps({'first_run_s': time.perf_counter() - started, 'exception': [str(e.value) for e in app.exception]}))
+"""
+
+
+def run_python(script, *args, env=None):
+    output = subprocess.run(
+        [sys.executable, "-c", script, *args],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+# 채널별로 화면을 연 뒤 아무 조작 없이 재실행하는 데 걸리는 시간
+def measure_reruns(reruns, timeout):
+    from bench import fakes
+    fakes.install(fakes.load_fixtures(None), fakes.FaultInjector(latency={}))
+
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    app.secrets.update(SECRETS)
+    app.run()
+    durations = {}
+    for source in ("YouTube", "뉴스", "재무정보"):
+        app.sidebar.radio(key="source").set_value(source).run()
+        samples = []
+        for _ in range(reruns):
+            started = time.perf_counter()
+            app.run()
+            samples.append(time.perf_counter() - started)
+        durations[source] = samples
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AIsenet 시작/재실행 비용 점검")
+    parser.add_argument("--reruns", type=int, default=10, help="채널별 재실행 횟수")
+    parser.add_argument("--import-budget", type=float, default=0.8, help="엔진 import + 생성 시간 예산 (초)")
+    parser.add_argument("--first-run-budget", type=float, default=3.0, help="첫 화면 실행 시간 예산 (초)")
+    parser.add_argument("--rerun-budget", type=float, default=0.3, help="채널별 재실행 시간 p50 예산 (초)")
+    parser.add_argument("--timeout", type=float, default=120, help="스크립트 실행 1회 제한 시간 (초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix="aisenet-startup-")
+    # 첫 화면 실행은 백그라운드 사전 계산 없이 측정 (주요 종목 재무정보 저장은 백그라운드 스레드에서 진행)
+    env = dict(os.environ, AISENET_CACHE_DIR=cache_dir)
+    os.environ["AISENET_CACHE_DIR"] = cache_dir
+
+    imports = run_python(IMPORT_SCRIPT, json.dumps(SECRETS), cache_dir, json.dumps(LAZY_MODULES), env=env)
+    cold_start = run_python(COLD_START_SCRIPT, APP_PATH, json.dumps(SECRETS), env=env)
+    reruns = measure_reruns(args.reruns, args.timeout)
+
+    report = {
+        'engine_import_s': round(imports['import_s'], 3),
+        'engine_create_s': round(imports['create_s'], 3),
+        'eagerly_loaded': imports['loaded'],
+        'first_run_s': round(cold_start['first_run_s'], 3),
+        'reruns': {
+            source: {'p50_s': round(percentile(samples, 0.5), 3), 'max_s': round(max(samples), 3)}
+            for source, samples in reruns.items()
+        },
+    }
+
+    violations = []
+    if imports['loaded']:
+        violations.append(f"엔진 생성 시 불러온 무거운 라이브러리: {', '.join(imports['loaded'])}")
+    if imports['import_s'] + imports['create_s'] > args.import_budget:
+        violations.append(f"엔진 import + 생성 {imports['import_s'] + imports['create_s']:.3f}초 > 예산 {args.import_budget}초")
+    if cold_start['exception']:
+        violations.append(f"첫 화면 실행 오류: {cold_start['exception'][0]}")
+    if cold_start['first_run_s'] > args.first_run_budget:
+        violations.append(f"첫 화면 실행 {cold_start['first_run_s']:.3f}초 > 예산 {args.first_run_budget}초")
+    for source, stats in report['reruns'].items():
+        if stats['p50_s'] > args.rerun_budget:
+            violations.append(f"{source} 재실행 p50 {stats['p50_s']}초 > 예산 {args.rerun_budget}초")
+    report['violations'] = violations
+
+    print(f"엔진 import {report['engine_import_s']}초, 생성 {report['engine_create_s']}초")
+    print(f"첫 화면 실행 {report['first_run_s']}초")
+    for source, stats in report['reruns'].items():
+        print(f"{source} 재실행 p50 {stats['p50_s']}초, 최대 {stats['max_s']}초")
+    for violation in violations:
+        print("예산 초과:", violation)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
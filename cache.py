@@ -0,0 +1,267 @@
+# AIsenet 캐시 모듈
+# Streamlit 세션/프로세스 간에 공유되는 SQLite 기반 디스크 캐시를 제공합니다.
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# 기본 캐시 디렉터리 (환경 변수로 변경 가능)
+DEFAULT_CACHE_DIR = os.environ.get(
+    "AISENET_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+
+# 캐시 미스를 나타내는 값 (None도 정상 값으로 저장할 수 있도록 별도 객체 사용)
+MISS = object()
+
+
+# SQLite 디스크 캐시 (TTL + 용량 기반 LRU 축출)
+class DiskCache:
+    def __init__(self, path, table="cache", max_bytes=100 * 1024 * 1024, default_ttl=None):
+        self.path = path
+        self.table = table
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # 여러 프로세스가 같은 파일을 공유하므로 WAL 모드와 잠금 대기 시간을 설정
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )""")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)")
+
+    # 값 조회 (없거나 만료된 경우 MISS 반환)
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return MISS
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return MISS
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    # 값 저장 (ttl 초 단위, None이면 default_ttl 사용)
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, data, size, now, expires_at, now)
+            )
+            self._evict(now)
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    # 만료 항목 삭제 후 용량 초과 시 가장 오래 사용되지 않은 항목부터 삭제
+    def _evict(self, now):
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+        total = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC"
+        ):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+
+    # 저장 항목 수와 전체 크기
+    def usage(self):
+        with self._lock:
+            entries, total = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        return {"entries": entries, "bytes": total, "max_bytes": self.max_bytes}
+
+
+# 자막 캐시 (video_id + 언어 기준, 자막 없음 결과도 저장)
+class TranscriptCache:
+    def __init__(self, path=None, ttl=30 * 24 * 3600, negative_ttl=24 * 3600, max_bytes=200 * 1024 * 1024):
+        self.store = DiskCache(
+            path or os.path.join(DEFAULT_CACHE_DIR, "transcripts.sqlite3"),
+            table="transcripts",
+            max_bytes=max_bytes,
+            default_ttl=ttl
+        )
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(video_id, language):
+        return f"{video_id}:{language}"
+
+    # (캐시 적중 여부, 자막) 반환. 자막 없음으로 기록된 영상은 (True, None)
+    def get(self, video_id, language):
+        value = self.store.get(self._key(video_id, language))
+        with self._lock:
+            if value is MISS:
+                self.misses += 1
+                return False, None
+            if value is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+        return True, value
+
+    def set(self, video_id, language, transcript):
+        self.store.set(self._key(video_id, language), transcript)
+
+    # 어디에서도 자막을 찾을 수 없는 영상 기록 (짧은 TTL 적용)
+    def set_negative(self, video_id, language):
+        self.store.set(self._key(video_id, language), None, ttl=self.negative_ttl)
+
+    def stats(self):
+        with self._lock:
+            stats = {"hits": self.hits, "negative_hits": self.negative_hits, "misses": self.misses}
+        stats.update(self.store.usage())
+        return stats
+
+
+# 메모리 캐시 (TTL + 용량 기반 LRU 축출, 스레드 안전)
+class MemoryCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return MISS
+            value, size, expires_at = item
+            if expires_at is not None and expires_at <= now:
+                del self._items[key]
+                self._bytes -= size
+                return MISS
+            self._items.move_to_end(key)
+            return value
+
+    # size는 값의 바이트 크기 (축출 기준)
+    def set(self, key, value, size, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._items[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._items.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def usage(self):
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+# 보고서 종류별 기본 TTL (초)
+DEFAULT_LLM_TTLS = {
+    "video": 7 * 24 * 3600,
+    "news": 3600,
+    "financial": 90 * 24 * 3600,
+}
+
+
+# LLM 응답 캐시 (모델명 + 프롬프트 해시 기준, 메모리/디스크 2단계)
+class LLMCache:
+    def __init__(self, path=None, ttls=None, memory_max_bytes=32 * 1024 * 1024, disk_max_bytes=256 * 1024 * 1024):
+        self.ttls = dict(DEFAULT_LLM_TTLS, **(ttls or {}))
+        self.memory = MemoryCache(memory_max_bytes)
+        self.disk = DiskCache(
+            path or os.path.join(DEFAULT_CACHE_DIR, "llm.sqlite3"),
+            table="llm_responses",
+            max_bytes=disk_max_bytes
+        )
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model_name, prompt):
+        return hashlib.sha256(f"{model_name}\n{prompt}".encode("utf-8")).hexdigest()
+
+    # 캐시된 응답 텍스트 반환 (없으면 None)
+    def get(self, model_name, prompt):
+        key = self.key(model_name, prompt)
+        text = self.memory.get(key)
+        if text is not MISS:
+            with self._lock:
+                self.memory_hits += 1
+            return text
+
+        entry = self.disk.get(key)
+        if entry is MISS:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # 디스크 적중 시 남은 TTL만큼 메모리에 올려둠
+        text, expires_at = entry["text"], entry["expires_at"]
+        ttl = expires_at - time.time() if expires_at else None
+        self.memory.set(key, text, len(text.encode("utf-8")), ttl=ttl)
+        with self._lock:
+            self.disk_hits += 1
+        return text
+
+    def set(self, model_name, prompt, text, report_type):
+        key = self.key(model_name, prompt)
+        ttl = self.ttls.get(report_type)
+        expires_at = time.time() + ttl if ttl else None
+        self.memory.set(key, text, len(text.encode("utf-8")), ttl=ttl)
+        self.disk.set(key, {"text": text, "expires_at": expires_at}, ttl=ttl)
+
+    def stats(self):
+        with self._lock:
+            stats = {"memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses}
+        stats["memory"] = self.memory.usage()
+        stats["disk"] = self.disk.usage()
+        return stats
@@ -0,0 +1,853 @@
+# AIsenet 검색/분석 엔진
+# Streamlit에 의존하지 않는 검색과 보고서 생성 파이프라인입니다.
+# 설정(API 키 등)은 secrets와 같은 키를 가진 dict로 받고, 오류는 예외로 알리며,
+# 보고서 스트리밍과 진행 상황은 콜백으로 전달합니다.
+# Streamlit 앱(AIsenet.py)과 일괄 작업 CLI/HTTP API(jobs.py)가 같은 엔진을 사용합니다.
+#
+# 불러오는 데 시간이 오래 걸리는 라이브러리(google.generativeai, apify_client, yfinance, pandas 등)는
+# 해당 기능을 처음 사용할 때 불러오므로, 엔진을 불러오고 만드는 비용은 가볍게 유지됩니다.
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+import isodate
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from google.api_core import exceptions as google_exceptions
+from cache import DiskCache, TranscriptCache, LLMCache, MISS, DEFAULT_CACHE_DIR
+from youtube_pool import YouTubeClientPool, QUOTA_COSTS
+from transcripts import FOUND, NOT_FOUND
+from http_client import HTTPClient, KeyRotator, SERVER_ERROR_STATUSES
+from symbols import SymbolIndex, looks_like_code
+from news_clusters import cluster_texts
+from news_scheduler import NewsReportScheduler
+from llm_dispatcher import LLMDispatcher, INTERACTIVE, BACKGROUND
+from tracing import TRACER, span, key_label
+
+# 사용할 Gemini 모델
+GEMINI_MODEL = 'gemini-2.0-flash'
+
+# 긴 자막 map-reduce 요약 설정 (토큰 수는 문자 수 기준 추정치)
+CHARS_PER_TOKEN = 2                   # 한국어/영어 혼합 자막 기준 보수적 추정
+MAP_REDUCE_THRESHOLD_TOKENS = 12000   # 이보다 긴 자막은 구간별로 나누어 요약
+TRANSCRIPT_CHUNK_TOKENS = 4000        # 구간당 최대 토큰 수
+MAP_CONCURRENCY = 4                   # 동시에 요약할 구간 수
+
+# 검색 결과 일괄 요약 설정
+BATCH_CONCURRENCY = 10                # 동시에 처리할 영상 수 (자막/정보 수집)
+BATCH_LLM_CONCURRENCY = 3             # 일괄 요약 중 동시 Gemini 호출 수
+
+# YouTube 영상 상세 정보 조회 설정
+VIDEOS_LIST_BATCH_SIZE = 50           # videos.list 한 번에 조회할 최대 영상 수
+COMMENT_FETCH_CONCURRENCY = 10        # 동시에 요청할 댓글 조회 수
+VIDEO_DETAILS_TTL = 6 * 3600          # 영상 상세 정보 캐시 유지 시간 (조회수/댓글 변화 반영)
+
+# 자막 조회 설정 (youtube-transcript-api와 Apify 경쟁 조회)
+TRANSCRIPT_HEDGE_DELAY = 3.0          # 직접 조회 시작 후 Apify 실행을 시작하기까지 대기 시간 (초)
+TRANSCRIPT_DEADLINE = 60.0            # 자막 조회 전체 시간 상한 (초)
+
+# 뉴스 검색 설정
+NEWS_MAX_PAGES = 1                    # 검색 1회에 가져올 최대 Serp API 결과 페이지 수 (페이지마다 크레딧 1개, 여러 페이지 동시 조회는 NEWS_MAX_PAGES 설정으로 켬)
+NEWS_PAGE_SIZE = 10                   # 페이지당 기사 수
+
+# 뉴스 증분 분석 설정 (같은 조건으로 다시 검색하면 이전 보고서에 새 기사만 반영)
+NEWS_DELTA_MAX_RATIO = 0.5            # 새 기사 비율이 이보다 크면 전체 재작성
+NEWS_REPORT_MAX_AGE = 6 * 3600        # 마지막 전체 작성 후 이 시간이 지나면 전체 재작성 (조회 기간의 사전 계산 주기가 더 짧으면 그 주기)
+NEWS_REPORT_TTL = 7 * 24 * 3600       # 이전 기사 목록/보고서 보관 기간
+
+# 기본 뉴스 검색(추가 검색어 없음) 사전 계산 주기 (조회 기간별, 초)
+NEWS_PRECOMPUTE_INTERVALS = {
+    "모두": 3 * 3600,
+    "최근 1일": 3600,
+    "최근 1주일": 3 * 3600,
+    "최근 1개월": 6 * 3600,
+    "최근 3개월": 12 * 3600,
+    "최근 6개월": 24 * 3600,
+    "최근 1년": 24 * 3600,
+}
+NEWS_PRECOMPUTE_CONCURRENCY = 2       # 동시에 갱신할 조합 수
+NEWS_PRECOMPUTE_ACTIVE_WINDOW = 6 * 3600  # 마지막으로 조회된 후 이 시간 동안만 주기적으로 갱신 (초)
+NEWS_PRECOMPUTE_MAX_STALE_FACTOR = 2  # 갱신 주기의 이 배수보다 오래된 결과는 사용하지 않고 직접 검색
+
+# 금융 도메인별 키워드 정의
+FINANCE_DOMAINS = {
+    "주식": ["주식", "증권", "배당주", "주가", "상장", "코스피", "코스닥", "러셀", "나스닥", "S&P500", "다우존스", "닛케이"],
+    "부동산": ["부동산", "아파트", "주택", "오피스텔", "분양", "청약", "재건축", "재개발", "임대", "상가"],
+    "코인": ["암호화폐", "가상화폐", "가상자산", "비트코인", "이더리움", "블록체인", "코인", "거래소", "채굴", "NFT"],
+    "채권/금리/환율": ["채권", "국채", "회사채", "금리", "한국은행", "한은", "연준", "환율", "통화", "달러", "엔화", "위안화", "유로화"],
+    "경제일반": ["경제", "금융", "무역", "물가", "인플레이션", "국내총생산", "GDP", "소비자물가지수", "생산자물가지수","CPI", "고용", "수출", "소비"]
+}
+
+# 주요 주식 리스트
+MAJOR_STOCKS = [
+    "Apple Inc. (AAPL)",
+    "Microsoft Corporation (MSFT)",
+    "Amazon.com Inc. (AMZN)",
+    "Alphabet Inc. (GOOGL)",
+    "Meta Platforms, Inc. (META)",
+    "Tesla, Inc. (TSLA)",
+    "NVIDIA Corporation (NVDA)",
+    "JPMorgan Chase & Co. (JPM)",
+    "Johnson & Johnson (JNJ)",
+    "Visa Inc. (V)",
+    "Realty Income Corporation (O)",
+    "Starbucks Corporation (SBUX)",
+    "McDonald's Corporation (MCD)"
+]
+
+# 외부 API 주소
+SERP_API_URL = "https://serpapi.com/search.json"
+YAHOO_SEARCH_URL = "https://query2.finance.yahoo.com/v1/finance/search"
+
+# 정상 종료로 간주하는 Gemini finish_reason
+NORMAL_FINISH_REASONS = ("FINISH_REASON_UNSPECIFIED", "STOP", "MAX_TOKENS")
+
+
+# 사용 가능한 API 키가 없음 (크레딧 소진, 요청 한도 초과)
+class NoAvailableKeyError(Exception):
+    pass
+
+# 보고서 생성 실패 (안전 차단, 빈 응답 등)
+class ReportGenerationError(Exception):
+    pass
+
+
+# 조회 기간 선택 함수
+def get_published_after(option):
+    today = datetime.utcnow() + timedelta(hours=9)  # UTC 시간을 KST로 변환 (+9시간)
+    if option == "최근 1일":
+        return (today - timedelta(days=1)).isoformat("T") + "Z"
+    elif option == "최근 1주일":
+        return (today - timedelta(weeks=1)).isoformat("T") + "Z"
+    elif option == "최근 1개월":
+        return (today - timedelta(weeks=4)).isoformat("T") + "Z"
+    elif option == "최근 3개월":
+        return (today - timedelta(weeks=12)).isoformat("T") + "Z"
+    elif option == "최근 6개월":
+        return (today - timedelta(weeks=24)).isoformat("T") + "Z"
+    elif option == "최근 1년":
+        return (today - timedelta(weeks=52)).isoformat("T") + "Z"
+    else:
+        return None  # 이 경우 조회 기간 필터를 사용하지 않음
+
+# 주요 주식 목록 항목에서 종목 코드 추출 ("Apple Inc. (AAPL)" -> "AAPL")
+def stock_symbol_of(stock):
+    return stock.split('(')[-1].rstrip(')')
+
+# 토큰 수 추정 함수
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN
+
+# 자막 분할 함수 (구간당 추정 토큰 수 제한)
+def split_transcript(transcript, max_tokens=TRANSCRIPT_CHUNK_TOKENS):
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current = []
+    current_length = 0
+    for word in transcript.split():
+        if current and current_length + len(word) + 1 > max_chars:
+            chunks.append(' '.join(current))
+            current = []
+            current_length = 0
+        current.append(word)
+        current_length += len(word) + 1
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+# 기사 제목과 내용을 하나의 문자열로 결합 (유사 기사 수는 보도 비중으로 함께 전달)
+def format_news_articles(articles):
+    return "\n\n".join([
+        f"제목: {article['title']}\n보도 건수: {article.get('cluster_size', 1)}\n내용: {article['content']}"
+        for article in articles
+    ])
+
+
+class Engine:
+    # config: secrets.toml과 같은 키를 가진 dict
+    #   필수: GOOGLE_AI_STUDIO_API_KEY, YOUTUBE_API_KEY1~4, APIFY_API_KEY, SERP_API_KEY1~2
+    #   선택: LLM_CACHE_TTLS, GEMINI_REQUESTS_PER_MINUTE, GEMINI_TOKENS_PER_MINUTE
+    # 캐시, 클라이언트, 디스패처는 엔진 하나당 한 번만 만들어 모든 요청이 공유
+    # (Gemini, Apify, 재무정보 저장소는 처음 사용할 때 생성)
+    def __init__(self, config, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._gemini_api_key = config["GOOGLE_AI_STUDIO_API_KEY"]
+        self._apify_api_key = config["APIFY_API_KEY"]
+        youtube_api_keys = [config[f"YOUTUBE_API_KEY{i}"] for i in range(1, 5)]
+        self._resources = {}
+        self._resource_locks = {name: threading.Lock() for name in ('genai', 'transcript_resolver', 'financial_store')}
+
+        self.transcript_cache = TranscriptCache(os.path.join(cache_dir, "transcripts.sqlite3"))
+        # YouTube 클라이언트 풀 (키별 클라이언트 재사용 및 할당량 기반 키 선택)
+        self.youtube_pool = YouTubeClientPool(youtube_api_keys)
+        self.video_details_cache = DiskCache(os.path.join(cache_dir, "youtube.sqlite3"), table="video_details", default_ttl=VIDEO_DETAILS_TTL)
+        # 검색 조건별 이전 기사 목록과 보고서
+        self.news_report_store = DiskCache(os.path.join(cache_dir, "news.sqlite3"), table="news_reports", default_ttl=NEWS_REPORT_TTL)
+        # 공용 HTTP 클라이언트 (연결 재사용, 타임아웃, 재시도, 호스트별 지연 시간 통계)
+        self.http_client = HTTPClient()
+        self.serp_key_rotator = KeyRotator([config["SERP_API_KEY1"], config["SERP_API_KEY2"]])
+        self.news_max_pages = int(config.get("NEWS_MAX_PAGES", NEWS_MAX_PAGES))
+        # Yahoo 검색으로 찾은 종목은 파일에 저장되어 공유
+        self.symbol_index = SymbolIndex(path=os.path.join(cache_dir, "symbols.jsonl"))
+        # 보고서 종류별 유지 시간(초)은 LLM_CACHE_TTLS 항목으로 변경 가능 (예: news = 1800)
+        self.llm_cache = LLMCache(os.path.join(cache_dir, "llm.sqlite3"), ttls=dict(config.get("LLM_CACHE_TTLS", {})))
+        # 프로세스 전체 Gemini 분당 요청/토큰 한도
+        self.llm_dispatcher = LLMDispatcher(
+            requests_per_minute=config.get("GEMINI_REQUESTS_PER_MINUTE", 15),
+            tokens_per_minute=config.get("GEMINI_TOKENS_PER_MINUTE", 1_000_000),
+            retry_exceptions=(google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+        )
+        # 기본 뉴스 검색 사전 계산 스케줄러 (start_background에서 시작)
+        self.news_scheduler = NewsReportScheduler(
+            DiskCache(os.path.join(cache_dir, "news.sqlite3"), table="news_precomputed", default_ttl=NEWS_REPORT_TTL),
+            self.build_news_report,
+            FINANCE_DOMAINS,
+            NEWS_PRECOMPUTE_INTERVALS,
+            max_workers=NEWS_PRECOMPUTE_CONCURRENCY,
+            active_window=NEWS_PRECOMPUTE_ACTIVE_WINDOW,
+            max_stale_factor=NEWS_PRECOMPUTE_MAX_STALE_FACTOR,
+            miss=MISS
+        )
+
+    # 처음 사용할 때 한 번만 만드는 자원 (자원별 잠금이라 한 자원을 만드는 동안 다른 자원 사용은 막지 않음)
+    def _resource(self, name, create):
+        resource = self._resources.get(name)
+        if resource is None:
+            with self._resource_locks[name]:
+                resource = self._resources.get(name)
+                if resource is None:
+                    resource = self._resources[name] = create()
+        return resource
+
+    # google.generativeai 모듈 (처음 보고서를 만들 때 불러와 API 키 설정)
+    @property
+    def genai(self):
+        def create():
+            import google.generativeai as genai
+            genai.configure(api_key=self._gemini_api_key)
+            return genai
+        return self._resource('genai', create)
+
+    # 자막 조회기 (youtube-transcript-api와 Apify 경쟁 조회)
+    @property
+    def transcript_resolver(self):
+        def create():
+            from apify_client import ApifyClient
+            from transcripts import TranscriptResolver
+            return TranscriptResolver(ApifyClient(self._apify_api_key), hedge_delay=TRANSCRIPT_HEDGE_DELAY, deadline=TRANSCRIPT_DEADLINE)
+        return self._resource('transcript_resolver', create)
+
+    # 재무정보 저장소 (종목별 재무제표/기업 정보 파일 저장, yfinance/pandas는 이때 불러옴)
+    @property
+    def financial_store(self):
+        def create():
+            from financial_store import FinancialStore
+            return FinancialStore(os.path.join(self.cache_dir, "financials"))
+        return self._resource('financial_store', create)
+
+    # 주요 주식 재무정보 미리 저장, 기본 뉴스 검색 사전 계산 시작 (프로세스당 한 번만 호출)
+    # 재무정보 저장소는 첫 화면 표시를 막지 않도록 백그라운드 스레드에서 만듦
+    def start_background(self, precompute_news=False):
+        symbols = [stock_symbol_of(stock) for stock in MAJOR_STOCKS]
+        threading.Thread(target=lambda: self.financial_store.warm_up(symbols), name="financial-store-init", daemon=True).start()
+        if precompute_news:
+            self.news_scheduler.start()
+
+    # 뉴스 검색 결과 한 페이지 조회 (Serp API 사용, 사용 가능한 키가 없으면 None)
+    def fetch_news_page(self, params):
+        # API 키 번갈아 사용 (크레딧 소진/요청 한도 초과 키는 건너뛰고 다음 키로 재시도)
+        serp_key_rotator = self.serp_key_rotator
+        for _ in range(len(serp_key_rotator)):
+            api_key = serp_key_rotator.next()
+            if api_key is None:
+                break
+            with span("serpapi", key=key_label(serp_key_rotator.keys, api_key)) as s:
+                response = self.http_client.get(SERP_API_URL, params=dict(params, api_key=api_key), retry_statuses=SERVER_ERROR_STATUSES)
+                s.set(status=str(response.status_code), payload_bytes=len(response.content))
+                news_data = response.json()
+            error = news_data.get('error', '')
+            if 'run out of searches' in error:
+                serp_key_rotator.mark_exhausted(api_key)
+            elif response.status_code == 429:
+                serp_key_rotator.mark_exhausted(api_key, cooldown=60)
+            else:
+                return news_data
+        return None
+
+    # 뉴스 검색 (유사 기사를 묶어 묶음별 대표 기사 반환)
+    # 첫 페이지만으로 묶음 수가 max_results보다 적을 때만 나머지 페이지(최대 max_pages까지)를 동시에 가져옴
+    def search_news(self, domain, additional_query, published_after, max_results=10, max_pages=None):
+        keywords = " OR ".join(FINANCE_DOMAINS[domain])
+        max_pages = max_pages or self.news_max_pages
+
+        if additional_query:
+            query = f"({keywords}) AND ({additional_query})"
+        else:
+            query = keywords
+
+        params = {'q': query, 'tbm': 'nws', 'num': NEWS_PAGE_SIZE, 'sort': 'date'}
+
+        if published_after:
+            params['tbs'] = f"qdr:{published_after}"
+
+        first_page = self.fetch_news_page(dict(params, start=0))
+        if first_page is None:
+            raise NoAvailableKeyError("사용 가능한 Serp API 키가 없습니다. 잠시 후 다시 시도해주세요.")
+        articles = first_page.get('news_results', [])
+        representatives = self.cluster_news(articles)
+
+        # 첫 페이지가 가득 찼는데 묶음이 부족하면 (전재 기사가 많으면) 다음 페이지 추가 조회
+        if len(representatives) < max_results and len(articles) >= NEWS_PAGE_SIZE and max_pages > 1:
+            with ThreadPoolExecutor(max_workers=max_pages - 1) as executor:
+                more_pages = list(executor.map(self.fetch_news_page, [dict(params, start=page * NEWS_PAGE_SIZE) for page in range(1, max_pages)]))
+            articles = articles + [article for news_data in more_pages if news_data for article in news_data.get('news_results', [])]
+            representatives = self.cluster_news(articles)
+
+        return representatives[:max_results]
+
+    # Serp API 기사 목록을 중복 제거 후 묶음별 대표 기사 목록으로 변환 (많이 보도된 묶음 먼저)
+    def cluster_news(self, articles):
+        unique_articles = []
+        seen_urls = set()
+        for article in articles:
+            if article.get('link') and article['link'] not in seen_urls:
+                unique_articles.append({
+                    'title': article.get('title', ''),
+                    'source': {'name': article.get('source', '')},
+                    'description': article.get('snippet', ''),
+                    'url': article.get('link', ''),
+                    'content': article.get('snippet', '')
+                })
+                seen_urls.add(article['link'])
+
+        # 제목+요약이 거의 같은 기사(전재/재배포)는 하나로 묶고, 내용이 가장 긴 기사를 대표로 사용
+        clusters = cluster_texts([f"{article['title']} {article['content']}" for article in unique_articles])
+        representatives = []
+        for members in clusters:
+            best = max(members, key=lambda i: len(unique_articles[i]['content']))
+            representative = dict(unique_articles[best])
+            representative['cluster_size'] = len(members)
+            representative['related_sources'] = [unique_articles[i]['source']['name'] for i in members if i != best]
+            representative['member_urls'] = [unique_articles[i]['url'] for i in members]
+            representatives.append(representative)
+
+        # 많이 보도된 묶음을 먼저 (같은 크기는 최신 순 유지)
+        representatives.sort(key=lambda article: -article['cluster_size'])
+        return representatives
+
+    # 사전 계산된 기본 뉴스 검색 결과 (없거나 너무 오래되었으면 None)
+    # 사전 계산이 켜져 있으면 갱신 주기가 지난 결과를 백그라운드에서 다시 계산하고,
+    # 조회한 조합은 일정 시간 동안 주기적 갱신 대상이 됨
+    def get_precomputed_news(self, domain, period):
+        self.news_scheduler.touch(domain, period)
+        record, stale = self.news_scheduler.get(domain, period)
+        if record and stale:
+            self.news_scheduler.request(domain, period)
+        return record
+
+    # YouTube 검색 함수 (검색 결과 수와 함께 반환)
+    # manual_captions_only: 업로더가 올린 자막이 있는 영상만 반환 (YouTube API는 자동 생성 자막 여부를 알려주지 않으므로
+    # 자동 생성 자막만 있는 영상도 제외됨, 자막이 없는 영상은 자막 조회기의 실패 캐시로 걸러짐)
+    def search_videos_with_transcript(self, domain, additional_query, published_after, max_results=10, manual_captions_only=False):
+        keywords = " OR ".join(FINANCE_DOMAINS[domain])
+        query = f"({keywords}) {additional_query}".strip()
+
+        response = self.youtube_pool.execute(
+            lambda youtube: youtube.search().list(
+                q=query,
+                type='video',
+                part='id,snippet',
+                order='relevance',
+                publishedAfter=published_after,
+                maxResults=max_results
+            ),
+            cost=QUOTA_COSTS['search'],
+            operation='search'
+        )
+
+        # 검색 결과 전체의 상세 정보를 한 번에 조회 (실패해도 검색 결과는 반환)
+        try:
+            video_details = self.enrich_videos([item['id']['videoId'] for item in response['items']])
+        except Exception:
+            video_details = {}
+
+        videos_with_transcript = []
+        for item in response['items']:
+            video_id = item['id']['videoId']
+            item['details'] = video_details.get(video_id, {})
+            if manual_captions_only and not item['details'].get('caption'):  # 수동 자막 있는 영상만 필터링
+                continue
+            videos_with_transcript.append(item)
+
+        return videos_with_transcript[:max_results], len(response['items'])
+
+    # 종목명으로 종목 코드 검색 함수
+    def search_stock_symbol(self, stock_name):
+        params = {
+            'q': stock_name,
+            'quotesCount': 1,
+            'newsCount': 0,
+            'enableFuzzyQuery': 'false',
+            'quotesQueryId': 'tss_match_phrase_query'
+        }
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        with span("yahoo.search") as s:
+            response = self.http_client.get(YAHOO_SEARCH_URL, params=params, headers=headers)
+            s.set(status=str(response.status_code), payload_bytes=len(response.content))
+            data = response.json()
+
+        if 'quotes' in data and len(data['quotes']) > 0:
+            quote = data['quotes'][0]
+            # 검색 결과를 색인에 추가하여 다음 조회부터 로컬에서 처리
+            self.symbol_index.add(quote['symbol'], quote.get('longname') or quote.get('shortname'), aliases=[stock_name])
+            return quote['symbol']
+        return None
+
+    # 종목 코드 결정 함수 (로컬 색인 정확 일치 → 종목 코드/티커 직접 입력 → Yahoo 검색 순)
+    # 비슷한 이름의 종목은 자동으로 고르지 않음 (추천 후보는 symbol_index.search로 사용자에게 표시)
+    def resolve_stock_symbol(self, stock_input):
+        stock_input = stock_input.strip()
+        symbol = self.symbol_index.lookup(stock_input)
+        if symbol:
+            return symbol
+        if looks_like_code(stock_input):
+            # 거래소 접미사가 있거나 지수/환율 코드이면 그대로 사용하고, 숫자 코드만 있으면 Yahoo 검색으로 거래소 확인
+            if '.' in stock_input or '=' in stock_input or stock_input.startswith('^'):
+                return stock_input.upper()
+            return self.search_stock_symbol(stock_input)
+        if stock_input.isascii() and stock_input.isalpha() and len(stock_input) <= 5:
+            return stock_input.upper()
+        return self.search_stock_symbol(stock_input)
+
+    # 여러 종목의 재무제표와 주가를 동시에 조회해 비교 패널 생성
+    # (비교 결과 또는 None, 종목별 조회 실패 메시지 목록) 반환
+    def search_comparison_info(self, stock_symbols):
+        from financial_store import fetch_price_history
+        from financial_features import compute_financial_features, build_peer_panel, peer_summary
+        warnings = []
+        with ThreadPoolExecutor(max_workers=len(stock_symbols) + 1) as executor:
+            # 주가는 모든 종목을 한 번의 yf.download 요청으로 조회
+            price_future = executor.submit(fetch_price_history, stock_symbols)
+            record_futures = {symbol: executor.submit(self.financial_store.get, symbol) for symbol in stock_symbols}
+            records = {}
+            for symbol, future in record_futures.items():
+                try:
+                    records[symbol] = future.result()
+                except Exception as e:
+                    warnings.append(f"{symbol} 재무정보 조회 중 오류 발생: {str(e)}")
+            try:
+                prices = price_future.result()
+            except Exception as e:
+                warnings.append(f"주가 조회 중 오류 발생: {str(e)}")
+                prices = None
+
+        # 결산월이 달라도 비교할 수 있도록 회계연도 기준으로 정렬
+        features = {
+            symbol: compute_financial_features(record['statements'], record['info'].get('currency'), period_format='FY%Y')
+            for symbol, record in records.items() if record
+        }
+        if not features:
+            return None, warnings
+        if prices is not None:
+            prices = prices.reindex(columns=list(features)).dropna(axis=1, how='all')
+        panel = build_peer_panel(features)
+        return {
+            'symbols': list(features),
+            'names': {symbol: records[symbol]['info'].get('longName') or symbol for symbol in features},
+            'panel': panel,
+            'peer_table': peer_summary(panel, prices),
+            'prices': prices,
+        }, warnings
+
+    # 재무정보 검색 함수 (저장소에 없으면 세 재무제표를 동시에 조회, 없는 종목이면 None)
+    def search_financial_info(self, stock_symbol):
+        record = self.financial_store.get(stock_symbol)
+        if record is None:
+            return None
+        return {name: df.to_dict() for name, df in record['statements'].items()}
+
+    # 자막 가져오기 함수
+    def get_video_transcript(self, video_id, languages=('ko', 'en')):
+        language = ','.join(languages)
+        cached, transcript_text = self.transcript_cache.get(video_id, language)
+        if cached:
+            with span("transcript", cache="hit"):
+                return transcript_text
+
+        # youtube-transcript-api와 Apify 중 먼저 자막을 가져온 쪽 사용
+        with span("transcript", cache="miss") as s:
+            status, transcript_text = self.transcript_resolver.resolve(video_id, languages)
+            s.set(status=status, payload_bytes=len(transcript_text.encode('utf-8')) if transcript_text else 0)
+        if status == FOUND:
+            self.transcript_cache.set(video_id, language, transcript_text)
+        elif status == NOT_FOUND:
+            # 두 경로 모두 자막이 없으면 다음 요청에서 Apify를 다시 호출하지 않도록 기록
+            # (오류나 시간 초과는 일시적일 수 있으므로 기록하지 않음)
+            self.transcript_cache.set_negative(video_id, language)
+        return transcript_text
+
+    # 영상 댓글 가져오기 함수
+    def fetch_video_comments(self, video_id):
+        try:
+            comments_response = self.youtube_pool.execute(
+                lambda youtube: youtube.commentThreads().list(
+                    part="snippet",
+                    videoId=video_id,
+                    textFormat="plainText",
+                    maxResults=30  # 상위 30개 댓글 가져오기
+                ),
+                cost=QUOTA_COSTS['commentThreads'],
+                operation='commentThreads'
+            )
+            return [item['snippet']['topLevelComment']['snippet']['textDisplay'] for item in comments_response['items']]
+        except Exception as e:
+            # 댓글이 비활성화된 영상 등
+            return []
+
+    # 영상 상세 정보 일괄 조회 함수
+    # videos.list 한 번에 최대 50개 영상을 조회하고 댓글은 동시에 요청하며, 결과는 영상별로 캐시
+    def enrich_videos(self, video_ids):
+        details = {}
+        missing = []
+        for video_id in video_ids:
+            cached = self.video_details_cache.get(video_id)
+            if cached is MISS:
+                missing.append(video_id)
+            else:
+                details[video_id] = cached
+        if not missing:
+            return details
+
+        fetched = {}
+        for start in range(0, len(missing), VIDEOS_LIST_BATCH_SIZE):
+            batch_ids = ",".join(missing[start:start + VIDEOS_LIST_BATCH_SIZE])
+            response = self.youtube_pool.execute(
+                lambda youtube: youtube.videos().list(
+                    part="snippet,contentDetails,statistics",
+                    id=batch_ids,
+                    maxResults=VIDEOS_LIST_BATCH_SIZE
+                ),
+                cost=QUOTA_COSTS['videos'],
+                operation='videos'
+            )
+            for item in response['items']:
+                content_details = item.get('contentDetails', {})
+                duration = content_details.get('duration')
+                fetched[item['id']] = {
+                    'description': item['snippet'].get('description'),
+                    'duration': isodate.parse_duration(duration).total_seconds() if duration else None,
+                    'view_count': int(item.get('statistics', {}).get('viewCount', 0)),
+                    'caption': content_details.get('caption') == 'true',  # 수동 자막 여부 (자동 생성 자막은 포함하지 않음)
+                    'comments': []
+                }
+
+        with ThreadPoolExecutor(max_workers=COMMENT_FETCH_CONCURRENCY) as executor:
+            futures = {executor.submit(self.fetch_video_comments, video_id): video_id for video_id in fetched}
+            for future in as_completed(futures):
+                fetched[futures[future]]['comments'] = future.result()
+
+        for video_id, record in fetched.items():
+            self.video_details_cache.set(video_id, record)
+            details[video_id] = record
+        return details
+
+    # 비디오 설명과 댓글 정보 가져오기 함수
+    def get_video_info(self, video_id):
+        try:
+            return self.enrich_videos([video_id]).get(video_id)
+        except Exception as e:
+            return None
+
+    # Gemini 보고서 생성 함수 (on_text가 주어지면 스트리밍으로 생성하며 지금까지 생성된 내용을 전달)
+    # 모든 호출은 디스패처를 거쳐 분당 요청/토큰 한도, 우선순위, 중복 호출 병합, 한도 초과 재시도가 적용됨
+    def generate_report(self, prompt, report_type, on_text=None, llm_slots=None, priority=INTERACTIVE):
+        llm_cache = self.llm_cache
+        cached_report = llm_cache.get(GEMINI_MODEL, prompt)
+        if cached_report is not None:
+            with span("gemini", report_type=report_type, cache="hit"):
+                return cached_report
+
+        def call():
+            with span("gemini.generate", report_type=report_type) as s:
+                model = self.genai.GenerativeModel(GEMINI_MODEL)
+                if on_text is None:
+                    response = model.generate_content(prompt)
+                    if not response or not response.parts:
+                        feedback = response.prompt_feedback if response else "No response received."
+                        raise ReportGenerationError(feedback)
+                    report = response.text
+                else:
+                    response = model.generate_content(prompt, stream=True)
+                    report = ""
+                    for chunk in response:
+                        # 스트리밍 도중 프롬프트 차단 또는 안전 필터 종료 감지
+                        if chunk.prompt_feedback and chunk.prompt_feedback.block_reason:
+                            raise ReportGenerationError(chunk.prompt_feedback)
+                        if not chunk.candidates:
+                            continue
+                        candidate = chunk.candidates[0]
+                        if candidate.finish_reason.name not in NORMAL_FINISH_REASONS:
+                            raise ReportGenerationError(f"finish_reason={candidate.finish_reason.name}")
+                        report += "".join(part.text for part in candidate.content.parts)
+                        on_text(report)
+                    if not report:
+                        raise ReportGenerationError(response.prompt_feedback or "No response received.")
+                # 응답에 사용량 정보가 없으면 문자 수로 추정
+                usage = getattr(response, 'usage_metadata', None)
+                s.set(
+                    prompt_tokens=getattr(usage, 'prompt_token_count', None) or estimate_tokens(prompt),
+                    response_tokens=getattr(usage, 'candidates_token_count', None) or estimate_tokens(report)
+                )
+            llm_cache.set(GEMINI_MODEL, prompt, report, report_type=report_type)
+            return report
+
+        # llm_slots가 주어지면 동시 Gemini 호출 수 제한 (대기 시간 포함 전체 소요 시간은 gemini 구간으로 기록)
+        with span("gemini", report_type=report_type, cache="miss"), llm_slots or nullcontext():
+            return self.llm_dispatcher.run(llm_cache.key(GEMINI_MODEL, prompt), call, estimate_tokens(prompt), priority)
+
+    # 자막 구간 요약 함수 (map 단계, 구간별 결과는 LLM 캐시에 저장)
+    def summarize_transcript_chunk(self, video_title, chunk, index, total, llm_slots=None):
+        prompt = f"""다음은 YouTube 영상 "{video_title}"의 자막 중 {index}/{total} 구간입니다. 이 구간에서 다룬 핵심 내용을 빠짐없이 한국어로 요약하세요. 언급된 수치, 종목, 지표, 전망은 그대로 유지하세요.
+자막 구간:
+{chunk}"""
+        return self.generate_report(prompt, "video", llm_slots=llm_slots)
+
+    # 긴 자막 구간별 동시 요약 함수 (on_progress가 주어지면 완료된 구간 수와 전체 구간 수를 전달)
+    def summarize_transcript_chunks(self, video_title, transcript, on_progress=None, llm_slots=None):
+        chunks = split_transcript(transcript)
+        summaries = [None] * len(chunks)
+        with ThreadPoolExecutor(max_workers=MAP_CONCURRENCY) as executor:
+            futures = {
+                executor.submit(self.summarize_transcript_chunk, video_title, chunk, i + 1, len(chunks), llm_slots): i
+                for i, chunk in enumerate(chunks)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                summaries[futures[future]] = future.result()
+                if on_progress is not None:
+                    on_progress(done, len(chunks))
+        return "\n\n".join(f"[구간 {i + 1}]\n{summary}" for i, summary in enumerate(summaries))
+
+    # YouTube 영상 요약 함수 (실패 시 예외)
+    def summarize_video(self, video_id, video_title, on_text=None, on_progress=None, llm_slots=None):
+        # 자막과 비디오 설명/댓글 동시 요청
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            transcript_future = executor.submit(self.get_video_transcript, video_id)
+            video_info_future = executor.submit(self.get_video_info, video_id)
+            transcript = transcript_future.result()
+            video_info = video_info_future.result()
+
+        if not transcript and not video_info:
+            return "비디오 정보를 가져올 수 없어 요약할 수 없습니다."
+
+        content = f"제목: {video_title}\n\n"
+
+        if transcript and estimate_tokens(transcript) > MAP_REDUCE_THRESHOLD_TOKENS:
+            # 긴 자막은 구간별 요약을 먼저 만든 뒤 종합 (reduce 단계)
+            content += f"자막 구간별 요약:\n{self.summarize_transcript_chunks(video_title, transcript, on_progress, llm_slots)}\n\n"
+        elif transcript:
+            content += f"자막 내용:\n{transcript}\n\n"
+
+        if video_info:
+            if video_info.get('description'):
+                content += f"비디오 설명:\n{video_info['description']}\n\n"
+
+            if video_info.get('comments'):
+                content += "주요 댓글:\n"
+                for comment in video_info['comments']:
+                    content += f"- {comment}\n"
+                content += "\n"
+
+        prompt = f"""다음 YouTube 영상의 정보를 바탕으로 가독성 있는 한 페이지의 보고서 형태로 요약하세요. 최종 결과는 한국어로 작성해주세요. 자막 내용이 메인 정보이고, 비디오 설명과 주요 댓글은 참고 정보입니다.
+보고서 구조:
+1. 영상 개요
+2. 주요 내용
+3. 시청자 반응 (댓글 기반)
+4. 결론 및 시사점
+영상 정보:
+{content}"""
+        return self.generate_report(prompt, "video", on_text, llm_slots)
+
+    # 여러 영상 일괄 요약 함수 (영상별 작업을 동시에 실행하고, on_text가 주어지면 완료될 때마다 중간 결과 전달)
+    # 영상별 실패는 해당 영상 항목에 오류 문구로 표시
+    def summarize_videos_batch(self, videos, on_text=None):
+        summaries = [None] * len(videos)
+        llm_slots = threading.BoundedSemaphore(BATCH_LLM_CONCURRENCY)
+
+        def summarize(video_id, video_title):
+            try:
+                return self.summarize_video(video_id, video_title, llm_slots=llm_slots)
+            except Exception as e:
+                return f"요약 중 오류가 발생했습니다: {str(e)}"
+
+        def render():
+            sections = []
+            for i, (video_id, video_title) in enumerate(videos):
+                summary = summaries[i] if summaries[i] is not None else "_요약하는 중..._"
+                sections.append(f"## {i + 1}. {video_title}\n\n{summary}")
+            return "\n\n---\n\n".join(sections)
+
+        with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as executor:
+            futures = {
+                executor.submit(summarize, video_id, video_title): i
+                for i, (video_id, video_title) in enumerate(videos)
+            }
+            for future in as_completed(futures):
+                summaries[futures[future]] = future.result()
+                if on_text is not None:
+                    on_text(render())
+        return render()
+
+    # 뉴스 분석 보고서 생성 (query가 주어지면 같은 조건의 이전 보고서에 새 기사만 반영, 기사가 없거나 실패 시 예외)
+    def build_news_analysis(self, articles, on_text=None, query=None, priority=INTERACTIVE):
+        if not articles:
+            raise ValueError("분석할 뉴스 기사가 없습니다.")
+        store = self.news_report_store
+        store_key = json.dumps(query, ensure_ascii=False) if query else None
+        previous = store.get(store_key) if store_key else MISS
+        urls = {url for article in articles for url in article.get('member_urls', [article['url']])}
+
+        # 마지막 전체 작성 후 조회 기간의 갱신 주기(최대 NEWS_REPORT_MAX_AGE)가 지나면 새 기사가 없어도 전체 재작성
+        max_age = min(NEWS_PRECOMPUTE_INTERVALS.get(query[2], NEWS_REPORT_MAX_AGE), NEWS_REPORT_MAX_AGE) if query else NEWS_REPORT_MAX_AGE
+        expired = previous is not MISS and time.time() - previous['built_at'] > max_age
+
+        new_articles = articles
+        if previous is not MISS:
+            seen_urls = set(previous['urls'])
+            new_articles = [
+                article for article in articles
+                if seen_urls.isdisjoint(article.get('member_urls', [article['url']]))
+            ]
+            # 새 기사가 없으면 이전 보고서 그대로 사용
+            if not new_articles and not expired:
+                return previous['report']
+
+        rebuild = (
+            previous is MISS
+            or expired
+            or len(new_articles) > len(articles) * NEWS_DELTA_MAX_RATIO
+        )
+        if rebuild:
+            prompt = f"""
+다음은 특정 주제에 관한 여러 뉴스 기사의 제목과 내용입니다. 이 기사들을 종합적으로 분석하여 가독성 있는 한 페이지의 보고서를 다음 형식을 참고하여 작성해주세요:
+
+1. 주요 이슈 요약 (3-5개의 핵심 포인트)
+2. 상세 분석 (각 주요 이슈에 대한 심층 설명)
+3. 다양한 관점 (기사들에서 나타난 서로 다른 의견이나 해석)
+4. 시사점 및 향후 전망
+
+보고서는 한국어로 작성해주세요. 분석 시 객관성을 유지하고, 편향된 의견을 제시하지 않도록 주의해주세요.
+'보도 건수'는 같은 내용을 다룬 유사 기사 수입니다. 보도 건수가 많은 이슈일수록 비중 있게 다뤄주세요.
+
+기사 내용:
+{format_news_articles(articles)}
+"""
+        else:
+            prompt = f"""
+다음은 이전에 작성한 뉴스 종합 분석 보고서와 그 이후 새로 검색된 뉴스 기사입니다. 이전 보고서의 형식을 유지하면서 새 기사 내용을 반영해 갱신된 보고서를 작성해주세요.
+
+- 새 기사가 기존 이슈와 관련되면 해당 부분을 보완하고, 새로운 이슈이면 추가해주세요.
+- 새 기사와 관련 없는 기존 내용은 그대로 유지해주세요.
+- '보도 건수'는 같은 내용을 다룬 유사 기사 수입니다. 보도 건수가 많은 이슈일수록 비중 있게 다뤄주세요.
+- 갱신된 전체 보고서만 한국어로 출력해주세요.
+
+이전 보고서:
+{previous['report']}
+
+새 기사 내용:
+{format_news_articles(new_articles)}
+"""
+        report = self.generate_report(prompt, "news", on_text, priority=priority)
+
+        if store_key:
+            store.set(store_key, {
+                'urls': sorted(urls) if rebuild else sorted(urls | set(previous['urls'])),
+                'report': report,
+                'built_at': time.time() if rebuild else previous['built_at'],
+            })
+        return report
+
+    # 뉴스 검색 결과와 분석 보고서 생성 (기본값은 백그라운드 사전 계산용, 결과가 없으면 예외)
+    def build_news_report(self, domain, period, additional_query="", priority=BACKGROUND):
+        additional_query = additional_query.strip()
+        articles = self.search_news(domain, additional_query, get_published_after(period))
+        if not articles:
+            raise ValueError(f"{domain} / {period} 뉴스 검색 결과가 없습니다.")
+        report = self.build_news_analysis(articles, query=[domain, additional_query, period], priority=priority)
+        return {'articles': articles, 'report': report}
+
+    # 재무정보 분석 (실패 시 예외)
+    def analyze_financial_info(self, financial_data, stock_symbol, stock_name, on_text=None, currency=None):
+        from financial_features import format_financial_features
+        # 재무제표에서 주요 지표를 미리 계산해 작은 표로 변환 (단위 환산 포함)
+        financial_info = format_financial_features(financial_data, currency)
+
+        prompt = f"""
+다음은 {stock_name} ({stock_symbol}) 주식의 재무정보입니다. 이 정보를 바탕으로 종합적인 재무 분석 보고서를 작성해주세요. 보고서는 다음 형식을 참고하여 작성해주세요:
+
+1. 기업 개요
+2. 주요 재무지표 분석
+   - 수익성
+   - 성장성
+   - 안정성
+3. 주식 가치평가
+4. 리스크 요인
+5. 향후 전망 및 투자 의견
+
+주요 재무 데이터를 표 형태로 정리하여 보고서에 포함시켜주세요.
+(우측 끝에 '비고' 컬럼을 추가하여 특이사항이 있을 경우 명시해주세요.)
+아래 재무 정보의 금액과 비율은 미리 계산된 값이므로 다시 계산하지 말고 주어진 단위 그대로 사용해주세요.
+손익 관련 지표는 금액과 비율을 같이 표시해주세요.
+표는 Markdown 형식을 사용하여 작성해주세요.
+
+재무 정보:
+{financial_info}
+"""
+        return self.generate_report(prompt, "financial", on_text)
+
+    # 여러 종목 비교 분석 (한 번의 요청으로 비교 보고서 생성, 실패 시 예외)
+    def analyze_comparison(self, comparison, on_text=None):
+        from financial_features import to_markdown_table
+        names = ", ".join(f"{comparison['names'][symbol]} ({symbol})" for symbol in comparison['symbols'])
+        yearly_tables = "\n\n".join(
+            f"{comparison['names'][symbol]} ({symbol}) 연도별 재무 비율 (단위: %)\n"
+            f"{to_markdown_table(comparison['panel'].loc[symbol].dropna(how='all'), '{:,.1f}')}"
+            for symbol in comparison['symbols']
+        )
+
+        prompt = f"""
+다음은 {names} 종목의 비교 데이터입니다. 이 정보를 바탕으로 종목 간 비교 분석 보고서를 작성해주세요. 보고서는 다음 형식을 참고하여 작성해주세요:
+
+1. 비교 대상 개요
+2. 수익성 비교
+3. 성장성 비교
+4. 재무 안정성 및 현금흐름 비교
+5. 주가 성과 비교 (최근 1년 수익률, 변동성)
+6. 종합 평가 및 종목별 투자 시사점
+
+종목별 주요 지표를 하나의 비교 표로 정리하여 보고서에 포함시켜주세요.
+아래 비율은 미리 계산된 값이므로 다시 계산하지 말고 그대로 사용해주세요.
+회계연도(FY)는 각 기업의 결산 연도 기준이므로 결산월이 다를 수 있습니다.
+표는 Markdown 형식을 사용하여 작성해주세요.
+
+최신 회계연도 기준 비교 표 (단위: %):
+{to_markdown_table(comparison['peer_table'], '{:,.1f}')}
+
+{yearly_tables}
+"""
+        return self.generate_report(prompt, "financial", on_text)
+
+    # 운영 지표 (디스패처, 캐시, 외부 API, 사전 계산 상태)
+    def stats(self):
+        return {
+            'stages': TRACER.stats(),
+            'llm_dispatcher': self.llm_dispatcher.stats(),
+            'caches': {
+                'transcript': self.transcript_cache.stats(),
+                'llm': self.llm_cache.stats(),
+                'financial_store': self.financial_store.stats(),
+            },
+            'http': self.http_client.stats(),
+            'youtube_keys': self.youtube_pool.stats(),
+            'news_precompute': self.news_scheduler.stats(),
+        }
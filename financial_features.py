@@ -0,0 +1,174 @@
+# 재무 지표 계산 모듈
+# 재무제표에서 수익성/성장성/안정성/현금흐름 지표를 기간별로 한 번에 계산하고,
+# 금액은 읽기 쉬운 단위(백만/억)로 환산해 프롬프트에 넣을 작은 표로 만듭니다.
+import numpy as np
+import pandas as pd
+
+# 항목별 이름 후보 (종목/yfinance 버전에 따라 이름이 다를 수 있어 앞에서부터 사용)
+LINE_ITEMS = {
+    'revenue': ['Total Revenue', 'Operating Revenue'],
+    'gross_profit': ['Gross Profit'],
+    'operating_income': ['Operating Income', 'EBIT'],
+    'net_income': ['Net Income', 'Net Income Common Stockholders'],
+    'total_assets': ['Total Assets'],
+    'total_liabilities': ['Total Liabilities Net Minority Interest', 'Total Liabilities'],
+    'equity': ['Stockholders Equity', 'Common Stock Equity'],
+    'total_debt': ['Total Debt'],
+    'current_assets': ['Current Assets'],
+    'current_liabilities': ['Current Liabilities'],
+    'cash': ['Cash And Cash Equivalents', 'Cash Cash Equivalents And Short Term Investments'],
+    'operating_cash_flow': ['Operating Cash Flow'],
+    'capex': ['Capital Expenditure'],
+    'free_cash_flow': ['Free Cash Flow'],
+}
+
+# 프롬프트에 넣을 금액 항목 (표시 이름)
+AMOUNT_LABELS = {
+    'revenue': '매출액',
+    'gross_profit': '매출총이익',
+    'operating_income': '영업이익',
+    'net_income': '순이익',
+    'total_assets': '자산총계',
+    'total_liabilities': '부채총계',
+    'equity': '자본총계',
+    'total_debt': '총차입금',
+    'cash': '현금성자산',
+    'operating_cash_flow': '영업활동현금흐름',
+    'capex': '설비투자(CAPEX)',
+    'free_cash_flow': '잉여현금흐름(FCF)',
+}
+
+# 억 단위를 사용하는 통화 (그 외는 백만 단위)
+HUNDRED_MILLION_CURRENCIES = ('KRW', 'JPY')
+
+# 프롬프트에 넣을 최대 기간 수
+MAX_PERIODS = 4
+
+
+# 통화에 맞는 금액 단위 (배수, 표시 이름)
+def amount_unit(currency):
+    currency = currency or 'USD'
+    if currency in HUNDRED_MILLION_CURRENCIES:
+        return 1e8, '억원' if currency == 'KRW' else f'억 {currency}'
+    return 1e6, f'백만 {currency}'
+
+
+# 재무제표들을 하나의 표(항목 × 기간)로 합치고 필요한 항목만 추출
+def extract_line_items(statements):
+    frames = [pd.DataFrame(statement) for statement in statements.values()]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(index=list(LINE_ITEMS))
+    combined = pd.concat(frames)
+    combined = combined[~combined.index.duplicated(keep='first')]
+    combined.columns = pd.to_datetime(combined.columns, errors='coerce')
+    combined = combined.loc[:, combined.columns.notna()].sort_index(axis=1)
+    combined = combined.apply(pd.to_numeric, errors='coerce')
+
+    # 항목별 첫 번째로 존재하는 이름의 행 사용 (없으면 NaN)
+    lines = pd.DataFrame(np.nan, index=list(LINE_ITEMS), columns=combined.columns)
+    for key, names in LINE_ITEMS.items():
+        for name in names:
+            if name in combined.index:
+                lines.loc[key] = combined.loc[name].to_numpy()
+                break
+
+    # FCF가 없으면 영업활동현금흐름 + 설비투자(음수)로 계산
+    lines.loc['free_cash_flow'] = lines.loc['free_cash_flow'].fillna(lines.loc['operating_cash_flow'] + lines.loc['capex'])
+
+    # 주요 항목이 모두 없는 기간 제외 후 최근 기간만 사용
+    lines = lines.loc[:, lines.notna().sum() > 0]
+    return lines.iloc[:, -MAX_PERIODS:]
+
+
+# 기간별 재무 지표 계산 (금액은 단위 환산, 비율은 % 값)
+def compute_financial_features(statements, currency=None, period_format='%Y.%m'):
+    lines = extract_line_items(statements)
+    scale, unit = amount_unit(currency)
+
+    def ratio(numerator, denominator):
+        return (lines.loc[numerator] / lines.loc[denominator]).replace([np.inf, -np.inf], np.nan) * 100
+
+    # 음수 기준값에서도 부호가 맞도록 절댓값 기준 증감률 계산
+    def growth(key):
+        previous = lines.loc[key].shift(1)
+        return ((lines.loc[key] - previous) / previous.abs()).replace([np.inf, -np.inf], np.nan) * 100
+
+    ratios = pd.DataFrame({
+        '매출총이익률': ratio('gross_profit', 'revenue'),
+        '영업이익률': ratio('operating_income', 'revenue'),
+        '순이익률': ratio('net_income', 'revenue'),
+        '매출 성장률': growth('revenue'),
+        '영업이익 성장률': growth('operating_income'),
+        '순이익 성장률': growth('net_income'),
+        'ROE': ratio('net_income', 'equity'),
+        'ROA': ratio('net_income', 'total_assets'),
+        '부채비율': ratio('total_liabilities', 'equity'),
+        '차입금/자기자본': ratio('total_debt', 'equity'),
+        '유동비율': ratio('current_assets', 'current_liabilities'),
+        'FCF 마진': ratio('free_cash_flow', 'revenue'),
+        'FCF/순이익': ratio('free_cash_flow', 'net_income'),
+    }).T
+
+    amounts = (lines.loc[list(AMOUNT_LABELS)] / scale).rename(index=AMOUNT_LABELS)
+
+    period_labels = [period.strftime(period_format) for period in lines.columns]
+    amounts.columns = period_labels
+    ratios.columns = period_labels
+    return {'unit': unit, 'amounts': amounts, 'ratios': ratios}
+
+
+# Markdown 표 작성 (값이 없으면 '-')
+def to_markdown_table(df, value_format):
+    if df.empty or not len(df.columns):
+        return "(데이터 없음)"
+    header = "| 항목 | " + " | ".join(df.columns) + " |"
+    divider = "|---|" + "---|" * len(df.columns)
+    rows = [
+        f"| {index} | " + " | ".join('-' if pd.isna(value) else value_format.format(value) for value in row) + " |"
+        for index, row in zip(df.index, df.to_numpy())
+    ]
+    return "\n".join([header, divider, *rows])
+
+
+# 프롬프트에 넣을 재무 지표 요약 (금액 표 + 비율 표)
+def format_financial_features(statements, currency=None):
+    features = compute_financial_features(statements, currency)
+    amounts = features['amounts'].dropna(how='all')
+    ratios = features['ratios'].dropna(how='all')
+    return (
+        f"주요 재무 항목 (단위: {features['unit']})\n"
+        f"{to_markdown_table(amounts, '{:,.1f}')}\n\n"
+        "주요 재무 비율 (단위: %)\n"
+        f"{to_markdown_table(ratios, '{:,.1f}')}"
+    )
+
+
+# 종목 비교 표에 사용할 지표
+PEER_METRICS = ['매출 성장률', '영업이익률', '순이익률', 'ROE', '부채비율', '유동비율', 'FCF 마진']
+
+# 연간 거래일 수 (변동성 연율화)
+TRADING_DAYS = 252
+
+
+# 종목별 비율 지표를 하나의 패널(종목, 지표) × 회계연도로 정렬 (회계연도 라벨이 겹치면 최근 값 사용)
+def build_peer_panel(features_by_symbol):
+    ratios = {
+        symbol: features['ratios'].T.groupby(level=0).last().T
+        for symbol, features in features_by_symbol.items()
+    }
+    if not ratios:
+        return pd.DataFrame()
+    return pd.concat(ratios, names=['symbol', 'metric']).sort_index(axis=1)
+
+
+# 종목별 최신 지표와 주가 지표를 합친 비교 표 (종목 × 지표)
+def peer_summary(panel, prices=None):
+    if panel.empty:
+        return pd.DataFrame(columns=PEER_METRICS)
+    latest = panel.ffill(axis=1).iloc[:, -1].unstack('metric')
+    table = latest.reindex(columns=PEER_METRICS)
+    if prices is not None and not prices.empty:
+        table['1년 주가 수익률'] = (prices.ffill().iloc[-1] / prices.bfill().iloc[0] - 1) * 100
+        table['연 변동성'] = prices.pct_change().std() * np.sqrt(TRADING_DAYS) * 100
+    return table
@@ -0,0 +1,186 @@
+# 재무정보 저장소
+# 종목별 재무제표와 기업 정보를 Parquet/JSON 파일로 저장하고, 공시 주기에 맞춘 TTL 동안 재사용합니다.
+# 캐시에 없으면 세 재무제표와 기업 정보를 동시에 가져옵니다.
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import yfinance as yf
+
+from tracing import span
+
+# 저장할 재무제표 (저장 이름 → yfinance 속성)
+STATEMENTS = {
+    'income_statement': 'financials',
+    'balance_sheet': 'balance_sheet',
+    'cash_flow_statement': 'cashflow',
+}
+
+# 저장할 기업 정보 항목
+INFO_FIELDS = ('longName', 'shortName', 'sector', 'industry', 'country', 'currency', 'marketCap')
+
+# 종목 코드를 그대로 디렉터리 이름으로 쓸 수 있는 문자 (그 외에는 해시 사용)
+SAFE_SYMBOL_PATTERN = re.compile(r"[A-Za-z0-9.\-^=]+")
+
+# TTL 설정 (초)
+FILING_LAG = 60 * 24 * 3600     # 결산일 이후 공시까지 여유 기간
+MIN_TTL = 24 * 3600             # 공시 예정일이 가까우면 하루마다 확인
+MAX_TTL = 30 * 24 * 3600        # 최대 보관 기간
+
+
+# 다음 공시 예상 시점까지를 TTL로 사용 (최근 두 결산일 간격으로 보고 주기 추정)
+def filing_ttl(statements, now=None):
+    now = now or time.time()
+    periods = sorted({
+        period
+        for df in statements.values()
+        for period in pd.to_datetime(pd.Index(df.columns), errors='coerce')
+        if not pd.isna(period)
+    })
+    if len(periods) < 2:
+        return MIN_TTL
+    interval = periods[-1] - periods[-2]
+    next_filing = (periods[-1] + interval).timestamp() + FILING_LAG
+    return min(max(next_filing - now, MIN_TTL), MAX_TTL)
+
+
+class FinancialStore:
+    def __init__(self, directory, fetch_concurrency=4):
+        self.directory = directory
+        self.fetch_concurrency = fetch_concurrency
+        self._lock = threading.Lock()
+        self._symbol_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    # 종목별 저장 디렉터리 (경로 구분자나 '..' 등이 들어간 종목 코드는 해시로 바꿔 저장소 밖에 쓰지 않도록 함)
+    def _symbol_dir(self, symbol):
+        if SAFE_SYMBOL_PATTERN.fullmatch(symbol) and symbol.strip('.'):
+            return os.path.join(self.directory, symbol)
+        return os.path.join(self.directory, '_' + hashlib.sha256(symbol.encode('utf-8')).hexdigest()[:32])
+
+    def _path(self, symbol, name):
+        return os.path.join(self._symbol_dir(symbol), name)
+
+    # 같은 종목을 동시에 두 번 가져오지 않도록 종목별 잠금 사용
+    def _symbol_lock(self, symbol):
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    # 종목의 재무제표와 기업 정보 반환 ({'statements': {이름: DataFrame}, 'info': dict}, 없으면 None)
+    def get(self, symbol):
+        with self._symbol_lock(symbol), span("financial_store") as s:
+            record = self._read(symbol)
+            with self._lock:
+                if record is not None:
+                    self.hits += 1
+                    s.set(cache="hit")
+                    return record
+                self.misses += 1
+            s.set(cache="miss")
+            record = self._fetch(symbol)
+            if record is not None:
+                self._write(symbol, record)
+            return record
+
+    # 저장된 데이터 읽기 (없거나 만료되면 None)
+    def _read(self, symbol):
+        try:
+            with open(self._path(symbol, 'info.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta['expires_at'] <= time.time():
+                return None
+            # 결산일이 열(column)이 되도록 저장 시 전치했던 표를 되돌림
+            statements = {
+                name: pd.read_parquet(self._path(symbol, f'{name}.parquet')).T
+                for name in STATEMENTS
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        return {'statements': statements, 'info': meta['info']}
+
+    # 저장된 기업 정보만 읽기 (재무제표 파일은 읽지 않음, 없으면 None)
+    def get_info(self, symbol):
+        try:
+            with open(self._path(symbol, 'info.json'), encoding='utf-8') as f:
+                return json.load(f)['info']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    # yfinance에서 재무제표 세 개와 기업 정보를 동시에 가져옴 (모두 비어 있으면 None)
+    def _fetch(self, symbol):
+        # yf.Ticker 객체는 스레드 간 공유하지 않음
+        def fetch_statement(attribute):
+            return getattr(yf.Ticker(symbol), attribute)
+
+        def fetch_info():
+            info = yf.Ticker(symbol).info or {}
+            return {field: info.get(field) for field in INFO_FIELDS}
+
+        with span("yfinance.statements"), ThreadPoolExecutor(max_workers=self.fetch_concurrency) as executor:
+            statement_futures = {name: executor.submit(fetch_statement, attribute) for name, attribute in STATEMENTS.items()}
+            info_future = executor.submit(fetch_info)
+            statements = {name: future.result() for name, future in statement_futures.items()}
+            try:
+                info = info_future.result()
+            except Exception:
+                info = {}
+
+        if all(df is None or df.empty for df in statements.values()):
+            return None
+        statements = {name: df if df is not None else pd.DataFrame() for name, df in statements.items()}
+        return {'statements': statements, 'info': info}
+
+    # 재무제표는 Parquet, 기업 정보와 만료 시각은 info.json에 저장 (info.json을 마지막에 써서 완료 표시)
+    def _write(self, symbol, record):
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+        for name, df in record['statements'].items():
+            table = df.T
+            table.columns = [str(column) for column in table.columns]
+            tmp_path = self._path(symbol, f'{name}.parquet.tmp')
+            table.to_parquet(tmp_path)
+            os.replace(tmp_path, self._path(symbol, f'{name}.parquet'))
+        meta = {
+            'info': record['info'],
+            'fetched_at': time.time(),
+            'expires_at': time.time() + filing_ttl(record['statements']),
+        }
+        tmp_path = self._path(symbol, 'info.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, self._path(symbol, 'info.json'))
+
+    # 여러 종목을 백그라운드에서 미리 저장 (오류가 난 종목은 건너뜀)
+    def warm_up(self, symbols):
+        def run():
+            for symbol in symbols:
+                try:
+                    self.get(symbol)
+                except Exception:
+                    pass
+
+        thread = threading.Thread(target=run, name="financial-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+# 여러 종목의 종가를 한 번의 요청으로 조회 (열 = 종목)
+def fetch_price_history(symbols, period='1y'):
+    symbols = list(symbols)
+    with span("yfinance.download", tickers=len(symbols)):
+        data = yf.download(symbols, period=period, auto_adjust=True, progress=False, threads=True)
+    if data is None or data.empty:
+        return pd.DataFrame(columns=symbols)
+    close = data['Close']
+    if isinstance(close, pd.Series):
+        close = close.to_frame(symbols[0])
+    return close.reindex(columns=symbols)
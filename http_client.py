@@ -0,0 +1,115 @@
+# 공용 HTTP 클라이언트
+# 연결을 재사용하는 세션, 명시적인 타임아웃, 429/5xx 재시도(지터 포함 지수 백오프),
+# 스레드 안전한 API 키 순환, 호스트별 지연 시간 통계를 제공합니다.
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 재시도할 HTTP 상태 코드
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+SERVER_ERROR_STATUSES = (500, 502, 503, 504)
+
+
+class HTTPClient:
+    # timeout: (연결, 읽기) 타임아웃 초
+    # max_backoff: 재시도 전 최대 대기 시간 (초, Retry-After가 이보다 길면 기다리지 않고 응답 반환)
+    def __init__(self, timeout=(3.05, 15), max_retries=3, backoff=0.5, max_backoff=10.0, pool_maxsize=20, latency_window=500):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(lambda: deque(maxlen=latency_window))
+        self._counts = defaultdict(lambda: {"requests": 0, "errors": 0, "retries": 0})
+
+    # GET 요청 (retry_statuses에 해당하는 응답과 연결 오류는 백오프 후 재시도)
+    def get(self, url, params=None, headers=None, retry_statuses=RETRY_STATUSES):
+        host = urlsplit(url).netloc
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(host, time.perf_counter() - started, error=True)
+                if attempt == self.max_retries:
+                    raise
+                self._sleep_before_retry(host, attempt)
+                continue
+
+            self._record(host, time.perf_counter() - started, error=response.status_code >= 400)
+            if response.status_code not in retry_statuses or attempt == self.max_retries:
+                return response
+            # 서버가 요청한 대기 시간이 너무 길면 화면/작업을 붙잡지 않도록 재시도하지 않고 응답 반환
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit() and float(retry_after) > self.max_backoff:
+                return response
+            self._sleep_before_retry(host, attempt, retry_after)
+
+    def _sleep_before_retry(self, host, attempt, retry_after=None):
+        with self._lock:
+            self._counts[host]["retries"] += 1
+        if retry_after and retry_after.isdigit():
+            # Retry-After보다 일찍 재시도하지 않음
+            delay = float(retry_after) * random.uniform(1.0, 1.2)
+        else:
+            delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+        time.sleep(min(delay, self.max_backoff))
+
+    def _record(self, host, elapsed, error):
+        with self._lock:
+            self._latencies[host].append(elapsed)
+            self._counts[host]["requests"] += 1
+            if error:
+                self._counts[host]["errors"] += 1
+
+    # 호스트별 요청 수, 오류 수, 재시도 수, 지연 시간(ms) 통계
+    def stats(self):
+        with self._lock:
+            stats = {}
+            for host, counts in self._counts.items():
+                latencies = sorted(self._latencies[host])
+                stats[host] = dict(counts)
+                if latencies:
+                    stats[host].update({
+                        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 1),
+                        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+                        "p95_ms": round(latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000, 1),
+                    })
+            return stats
+
+
+# 스레드 안전한 API 키 순환기 (크레딧이 소진된 키는 cooldown 동안 건너뜀)
+class KeyRotator:
+    def __init__(self, keys, cooldown=3600):
+        self.keys = list(keys)
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._index = 0
+        self._exhausted_until = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    # 다음 사용 가능한 키 (모두 소진된 경우 None)
+    def next(self):
+        now = time.time()
+        with self._lock:
+            for _ in range(len(self.keys)):
+                key = self.keys[self._index]
+                self._index = (self._index + 1) % len(self.keys)
+                if self._exhausted_until.get(key, 0) <= now:
+                    return key
+            return None
+
+    def mark_exhausted(self, key, cooldown=None):
+        with self._lock:
+            self._exhausted_until[key] = time.time() + (self.cooldown if cooldown is None else cooldown)
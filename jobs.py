@@ -0,0 +1,317 @@
+# AIsenet 일괄 보고서 작업 (CLI / HTTP 작업 API)
+# 보고서 작업 목록(JSONL)을 받아 동시 실행 수를 제한한 작업 스레드 풀에서 실행하고,
+# 완료되는 순서대로 결과를 JSONL로 내보냅니다. Streamlit 없이 검색/분석 엔진(engine.py)만 사용합니다.
+#
+# 작업 형식 (한 줄에 하나, id를 생략하면 입력 순번 사용)
+#   {"id": "n1", "type": "news", "domain": "주식", "period": "최근 1주일", "query": "반도체"}
+#   {"id": "y1", "type": "videos", "domain": "코인", "period": "최근 1일", "max_results": 5, "manual_captions_only": true}
+#   {"id": "v1", "type": "video", "video_id": "dQw4w9WgXcQ", "title": "영상 제목"}
+#   {"id": "f1", "type": "financial", "stock": "삼성전자"}
+#   {"id": "c1", "type": "compare", "stocks": ["AAPL", "MSFT", "NVDA"]}
+#
+# 사용 예:
+#   python jobs.py --concurrency 4 run jobs.jsonl -o results.jsonl
+#   python jobs.py --concurrency 4 serve --port 8600
+#   curl -N -X POST --data-binary @jobs.jsonl http://localhost:8600/jobs
+import argparse
+import hmac
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from engine import Engine, get_published_after
+from llm_dispatcher import INTERACTIVE
+from tracing import TRACER
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_PERIOD = "최근 1주일"
+DEFAULT_SECRETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".streamlit", "secrets.toml")
+MAX_REQUEST_BYTES = 1024 * 1024       # HTTP 요청 본문 최대 크기
+
+
+# 작업 형식 오류 (없는 종류, 필수 항목 누락, 결과 없음 등)
+class JobError(Exception):
+    pass
+
+
+def news_job(engine, job):
+    period = job.get('period', DEFAULT_PERIOD)
+    query = job.get('query', "")
+    # 추가 검색어가 없는 기본 검색은 사전 계산(--precompute-news) 갱신 대상으로 기록
+    if not query:
+        engine.news_scheduler.touch(job['domain'], period)
+    # 일괄 작업은 모두 같은 우선순위로 실행 (백그라운드 사전 계산 우선순위 사용 안 함)
+    record = engine.build_news_report(job['domain'], period, query, priority=INTERACTIVE)
+    return {'articles': record['articles'], 'report': record['report']}
+
+
+def videos_job(engine, job):
+    videos, total = engine.search_videos_with_transcript(
+        job['domain'],
+        job.get('query', ""),
+        get_published_after(job.get('period', DEFAULT_PERIOD)),
+        max_results=job.get('max_results', 5),
+        manual_captions_only=job.get('manual_captions_only', False)
+    )
+    if not videos:
+        raise JobError("YouTube 검색 결과가 없습니다.")
+    videos = [(video['id']['videoId'], video['snippet']['title']) for video in videos]
+    return {
+        'total_results': total,
+        'videos': [{'video_id': video_id, 'title': title, 'url': f"https://www.youtube.com/watch?v={video_id}"} for video_id, title in videos],
+        'report': engine.summarize_videos_batch(videos),
+    }
+
+
+def video_job(engine, job):
+    return {'report': engine.summarize_video(job['video_id'], job.get('title', job['video_id']))}
+
+
+def financial_job(engine, job):
+    stock_symbol = engine.resolve_stock_symbol(job['stock'])
+    if not stock_symbol:
+        raise JobError(f"{job['stock']}에 해당하는 종목을 찾을 수 없습니다.")
+    financial_info = engine.search_financial_info(stock_symbol)
+    if not financial_info:
+        raise JobError(f"{job['stock']}의 재무정보를 찾을 수 없습니다.")
+    company_info = engine.financial_store.get_info(stock_symbol) or {}
+    stock_name = company_info.get('longName') or stock_symbol
+    return {
+        'symbol': stock_symbol,
+        'name': stock_name,
+        'report': engine.analyze_financial_info(financial_info, stock_symbol, stock_name, currency=company_info.get('currency')),
+    }
+
+
+def compare_job(engine, job):
+    stock_symbols = []
+    for stock in job['stocks']:
+        symbol = engine.resolve_stock_symbol(stock)
+        if not symbol:
+            raise JobError(f"{stock}에 해당하는 종목을 찾을 수 없습니다.")
+        stock_symbols.append(symbol)
+    stock_symbols = list(dict.fromkeys(stock_symbols))
+    if len(stock_symbols) < 2:
+        raise JobError("비교할 종목을 두 개 이상 지정해주세요.")
+    comparison, warnings = engine.search_comparison_info(stock_symbols)
+    if not comparison:
+        raise JobError("비교할 종목의 재무정보를 찾을 수 없습니다.")
+    return {
+        'symbols': comparison['symbols'],
+        'names': comparison['names'],
+        # NaN은 null로 내보냄
+        'peer_table': json.loads(comparison['peer_table'].to_json(orient='index')),
+        'warnings': warnings,
+        'report': engine.analyze_comparison(comparison),
+    }
+
+
+JOB_HANDLERS = {
+    'news': news_job,
+    'videos': videos_job,
+    'video': video_job,
+    'financial': financial_job,
+    'compare': compare_job,
+}
+
+
+# 작업 하나 실행 (실패해도 예외 대신 status='error' 결과 반환)
+def run_job(engine, job):
+    started = time.perf_counter()
+    result = {'id': job.get('id'), 'type': job.get('type')}
+    try:
+        if 'invalid' in job:
+            raise JobError(f"작업을 읽을 수 없습니다: {job['invalid']}")
+        handler = JOB_HANDLERS.get(job.get('type'))
+        if handler is None:
+            raise JobError(f"알 수 없는 작업 종류입니다: {job.get('type')}")
+        result.update(handler(engine, job))
+        result['status'] = 'ok'
+    except KeyError as e:
+        result.update(status='error', error=f"필수 항목이 없습니다: {e}")
+    except Exception as e:
+        result.update(status='error', error=f"{type(e).__name__}: {e}")
+    result['elapsed_s'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+# 작업 목록을 executor에서 실행하고 완료되는 순서대로 결과 반환
+# 제출했지만 끝나지 않은 작업은 window개 이하로 유지하므로 입력을 한 줄씩 읽으면서 바로 시작할 수 있음
+def run_jobs(engine, jobs, executor, window=DEFAULT_CONCURRENCY):
+    pending = set()
+    for index, job in enumerate(jobs):
+        job.setdefault('id', index)
+        pending.add(executor.submit(run_job, engine, job))
+        if len(pending) >= window:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+# JSONL 줄 목록을 작업으로 변환 (빈 줄은 건너뛰고, 읽을 수 없는 줄은 오류 결과로 내보냄)
+def read_jobs(lines):
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+            if not isinstance(job, dict):
+                raise ValueError("작업은 JSON 객체여야 합니다.")
+            yield job
+        except ValueError as e:
+            yield {'id': f"line{number}", 'invalid': str(e)}
+
+
+def to_jsonl(result):
+    return json.dumps(result, ensure_ascii=False, default=str) + "\n"
+
+
+# secrets.toml(Streamlit과 같은 형식)을 읽고 같은 이름의 환경 변수로 덮어씀
+def load_config(path):
+    config = {}
+    if os.path.exists(path):
+        import tomllib
+        with open(path, 'rb') as f:
+            config = tomllib.load(f)
+    for name in ["GOOGLE_AI_STUDIO_API_KEY", "APIFY_API_KEY", "SERP_API_KEY1", "SERP_API_KEY2", "JOBS_API_TOKEN"] + [f"YOUTUBE_API_KEY{i}" for i in range(1, 5)]:
+        if os.environ.get(name):
+            config[name] = os.environ[name]
+    return config
+
+
+# HTTP 작업 API
+#   POST /jobs    본문: 작업 JSONL 또는 작업 JSON 배열, 응답: 결과 JSONL (완료되는 순서대로 전송)
+#   GET  /health  상태 확인 (토큰 없이 허용)
+#   GET  /metrics 구간별 지표 (Prometheus 텍스트 형식)
+# JOBS_API_TOKEN을 설정하면 Authorization: Bearer <토큰> 헤더가 있어야 함 (설정하지 않으면 인증 없이 누구나 호출 가능)
+def make_handler(engine, executor, window, token=None):
+    class JobRequestHandler(BaseHTTPRequestHandler):
+        def send_text(self, status, body, content_type="application/json; charset=utf-8"):
+            body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def authorized(self):
+            if not token:
+                return True
+            # 응답 시간으로 토큰을 추측할 수 없도록 상수 시간 비교
+            if hmac.compare_digest(self.headers.get("Authorization", "").encode('utf-8'), f"Bearer {token}".encode('utf-8')):
+                return True
+            self.send_text(401, json.dumps({'error': "unauthorized"}))
+            return False
+
+        def do_GET(self):
+            # 상태 확인은 토큰 없이 허용
+            if self.path == "/health":
+                self.send_text(200, json.dumps({'status': "ok"}))
+                return
+            if not self.authorized():
+                return
+            if self.path == "/metrics":
+                self.send_text(200, TRACER.to_prometheus(), "text/plain; version=0.0.4")
+            else:
+                self.send_text(404, json.dumps({'error': "not found"}))
+
+        def do_POST(self):
+            if not self.authorized():
+                return
+            if self.path != "/jobs":
+                self.send_text(404, json.dumps({'error': "not found"}))
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_REQUEST_BYTES:
+                self.send_text(413, json.dumps({'error': "request too large"}))
+                return
+            body = self.rfile.read(length).decode('utf-8')
+            if body.lstrip().startswith('['):
+                try:
+                    jobs = json.loads(body)
+                except ValueError as e:
+                    self.send_text(400, json.dumps({'error': str(e)}, ensure_ascii=False))
+                    return
+                jobs = [job if isinstance(job, dict) else {'invalid': "작업은 JSON 객체여야 합니다."} for job in jobs]
+            else:
+                jobs = read_jobs(body.splitlines())
+
+            # 길이를 미리 알 수 없으므로 연결을 닫아 응답 끝을 알림
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for result in run_jobs(engine, jobs, executor, window):
+                self.wfile.write(to_jsonl(result).encode('utf-8'))
+                self.wfile.flush()
+            self.close_connection = True
+
+        def log_message(self, format, *args):
+            sys.stderr.write(f"[{self.log_date_time_string()}] {format % args}\n")
+
+    return JobRequestHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AIsenet 일괄 보고서 작업")
+    parser.add_argument("--secrets", default=DEFAULT_SECRETS_PATH, help="secrets.toml 경로 (같은 이름의 환경 변수가 우선)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="동시에 실행할 작업 수")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="작업 JSONL 파일을 실행하고 결과를 JSONL로 출력")
+    run_parser.add_argument("jobs", nargs="?", default="-", help="작업 JSONL 파일 (기본값: 표준 입력)")
+    run_parser.add_argument("-o", "--output", default="-", help="결과 JSONL 파일 (기본값: 표준 출력)")
+
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="HTTP 작업 API 실행 (JOBS_API_TOKEN을 설정하지 않으면 인증 없이 열림)",
+        description="HTTP 작업 API 실행. JOBS_API_TOKEN을 설정하지 않으면 인증 없이 누구나 작업을 실행할 수 있으므로 "
+                    "127.0.0.1 밖으로 열 때는 반드시 토큰을 설정하세요."
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8600)
+    serve_parser.add_argument("--precompute-news", action="store_true", help="최근 요청된 기본 뉴스 검색을 주기적으로 사전 계산")
+    args = parser.parse_args()
+
+    config = load_config(args.secrets)
+    engine = Engine(config)
+    # 여러 요청이 한 작업 풀을 공유하므로 서버 전체 동시 실행 수가 concurrency로 제한됨
+    executor = ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="job")
+
+    if args.command == "run":
+        source = sys.stdin if args.jobs == "-" else open(args.jobs, encoding='utf-8')
+        output = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8')
+        failed = 0
+        with source, output:
+            for result in run_jobs(engine, read_jobs(source), executor, args.concurrency):
+                failed += result['status'] != 'ok'
+                output.write(to_jsonl(result))
+                output.flush()
+        executor.shutdown()
+        sys.exit(1 if failed else 0)
+
+    if args.precompute_news:
+        engine.start_background(precompute_news=True)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(engine, executor, args.concurrency, config.get("JOBS_API_TOKEN")))
+    print(f"AIsenet 작업 API: http://{args.host}:{args.port}/jobs", file=sys.stderr)
+    if not config.get("JOBS_API_TOKEN"):
+        print("경고: JOBS_API_TOKEN이 설정되지 않아 인증 없이 작업 API를 엽니다.", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
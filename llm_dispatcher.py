@@ -0,0 +1,134 @@
+# Gemini 호출 수락 제어 모듈
+# 프로세스 전체의 Gemini 호출을 분당 요청 수/토큰 수 버킷으로 제한하고, 우선순위 순서로 수락합니다.
+# 같은 프롬프트가 동시에 요청되면 한 번만 호출해 결과를 나누고(single-flight),
+# 요청 한도 초과 오류는 모든 호출을 잠시 멈춘 뒤 지수 백오프로 다시 시도합니다.
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+
+# 우선순위 (작을수록 먼저 수락)
+INTERACTIVE = 0   # 사용자가 직접 요청한 보고서
+BACKGROUND = 1    # 백그라운드 사전 계산
+
+
+# 진행 중인 호출 (같은 키의 후속 요청은 이 결과를 기다림)
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class LLMDispatcher:
+    # retry_exceptions: 요청 한도 초과로 보고 다시 시도할 예외 타입
+    def __init__(self, requests_per_minute=15, tokens_per_minute=1_000_000, max_retries=4, backoff=2.0,
+                 retry_exceptions=(), wait_window=500):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.retry_exceptions = tuple(retry_exceptions)
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._request_budget = float(requests_per_minute)
+        self._token_budget = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._flights = {}
+        self._waits = {INTERACTIVE: deque(maxlen=wait_window), BACKGROUND: deque(maxlen=wait_window)}
+        self._counts = {'admitted': 0, 'coalesced': 0, 'rate_limited': 0, 'failed': 0}
+
+    # key가 같은 호출이 진행 중이면 그 결과를 기다리고, 아니면 수락 후 call() 실행
+    def run(self, key, call, tokens, priority=INTERACTIVE):
+        with self._cond:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._counts['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._run_with_retry(call, tokens, priority)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._cond:
+                del self._flights[key]
+            flight.done.set()
+
+    def _run_with_retry(self, call, tokens, priority):
+        for attempt in range(self.max_retries + 1):
+            self._acquire(tokens, priority)
+            try:
+                return call()
+            except self.retry_exceptions:
+                with self._cond:
+                    self._counts['rate_limited'] += 1
+                    if attempt == self.max_retries:
+                        self._counts['failed'] += 1
+                        raise
+                    # 한도 초과 시 다른 호출도 함께 멈춤
+                    delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                    self._cond.notify_all()
+
+    def _refill(self, now):
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._request_budget = min(self.requests_per_minute, self._request_budget + elapsed * self.requests_per_minute / 60)
+        self._token_budget = min(self.tokens_per_minute, self._token_budget + elapsed * self.tokens_per_minute / 60)
+
+    # 다음 수락까지 기다려야 하는 시간 (초)
+    def _delay(self, tokens, now):
+        request_delay = (1 - self._request_budget) * 60 / self.requests_per_minute
+        token_delay = (tokens - self._token_budget) * 60 / self.tokens_per_minute
+        return max(request_delay, token_delay, self._paused_until - now, 0)
+
+    # 대기열 맨 앞이 되고 버킷에 여유가 생길 때까지 대기
+    def _acquire(self, tokens, priority):
+        tokens = min(tokens, self.tokens_per_minute)
+        enqueued_at = time.monotonic()
+        with self._cond:
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._queue, entry)
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                timeout = None
+                if self._queue[0] == entry:
+                    timeout = self._delay(tokens, now)
+                    if timeout <= 0:
+                        heapq.heappop(self._queue)
+                        self._request_budget -= 1
+                        self._token_budget -= tokens
+                        self._counts['admitted'] += 1
+                        self._waits[priority].append(now - enqueued_at)
+                        self._cond.notify_all()
+                        return
+                self._cond.wait(timeout)
+
+    # 대기열 길이, 진행 중 호출 수, 우선순위별 대기 시간(ms) 통계
+    def stats(self):
+        with self._cond:
+            stats = dict(self._counts)
+            stats['queue_depth'] = len(self._queue)
+            stats['in_flight'] = len(self._flights)
+            for priority, name in ((INTERACTIVE, 'interactive'), (BACKGROUND, 'background')):
+                waits = sorted(self._waits[priority])
+                if waits:
+                    stats[f'{name}_wait_p50_ms'] = round(waits[len(waits) // 2] * 1000, 1)
+                    stats[f'{name}_wait_p95_ms'] = round(waits[min(int(len(waits) * 0.95), len(waits) - 1)] * 1000, 1)
+            return stats
@@ -0,0 +1,71 @@
+# 유사 기사 묶음 모듈
+# 제목+요약을 문자 shingle로 나누어 MinHash 서명을 만들고, LSH 버킷으로 후보 쌍만 골라
+# 기사 수에 비례하는 시간 안에 거의 같은 기사(전재/재배포 기사)를 하나의 묶음으로 모읍니다.
+# 후보 쌍은 shingle 집합의 실제 Jaccard 유사도로 확인하고, 묶음 대표 기사와 비교해 서로 다른 기사가 연쇄적으로 묶이지 않게 합니다.
+import unicodedata
+import zlib
+
+import numpy as np
+
+SHINGLE_SIZE = 4         # 문자 shingle 길이 (한국어는 띄어쓰기 차이가 커서 단어 대신 문자 단위 사용)
+NUM_PERM = 64            # MinHash 해시 함수 수
+BANDS = 16               # LSH 밴드 수 (밴드당 NUM_PERM // BANDS 행)
+SIMILARITY_THRESHOLD = 0.5  # 같은 묶음으로 볼 Jaccard 유사도 (묶음 대표 기사 기준)
+
+# 해시 함수 계수 (실행마다 같은 묶음이 나오도록 고정 시드 사용)
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, 1 << 63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 1 << 63, size=NUM_PERM, dtype=np.uint64)
+
+
+# 공백/기호를 정리한 문자 shingle 집합 (32비트 해시)
+def shingles(text, size=SHINGLE_SIZE):
+    text = unicodedata.normalize('NFKC', text).lower()
+    text = ''.join(ch for ch in text if ch.isalnum())
+    if len(text) <= size:
+        return {zlib.crc32(text.encode('utf-8'))}
+    return {zlib.crc32(text[i:i + size].encode('utf-8')) for i in range(len(text) - size + 1)}
+
+
+# MinHash 서명 (multiply-shift 해시 NUM_PERM개의 최솟값, uint64 곱셈은 2^64로 나눈 나머지)
+def minhash(shingle_set):
+    hashes = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+    with np.errstate(over='ignore'):
+        return ((_A[:, None] * hashes[None, :] + _B[:, None]) >> np.uint64(32)).min(axis=1)
+
+
+# shingle 집합의 Jaccard 유사도
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+# 유사 기사 묶음 (인덱스 목록의 목록, 각 묶음과 묶음 순서는 처음 등장한 순서)
+# 묶음 대표는 가장 먼저 등장한 기사이며, 두 묶음은 대표끼리 threshold 이상 유사할 때만 합침
+def cluster_texts(texts, threshold=SIMILARITY_THRESHOLD, bands=BANDS):
+    shingle_sets = [shingles(text) for text in texts]
+    signatures = [minhash(shingle_set) for shingle_set in shingle_sets]
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # 같은 밴드 값을 가진 기사끼리만 유사도 확인 (MinHash 추정값은 오차가 있어 후보 선정에만 사용)
+    rows = NUM_PERM // bands
+    for band in range(bands):
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            key = signature[band * rows:(band + 1) * rows].tobytes()
+            members = buckets.setdefault(key, [])
+            for j in members:
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j and jaccard(shingle_sets[root_i], shingle_sets[root_j]) >= threshold:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+            members.append(i)
+
+    clusters = {}
+    for i in range(len(texts)):
+        clusters.setdefault(find(i), []).append(i)
+    return sorted(clusters.values(), key=lambda members: members[0])
@@ -0,0 +1,116 @@
+# 뉴스 보고서 사전 계산 스케줄러
+# 추가 검색어가 없는 기본 검색(도메인 × 조회 기간)의 뉴스 목록과 분석 보고서를 백그라운드에서
+# 주기적으로 갱신해 공용 저장소에 올려 두고, 검색 시에는 저장된 결과를 바로 반환합니다.
+# 갱신 주기가 지난 결과도 우선 반환하고 백그라운드에서 다시 계산합니다 (stale-while-revalidate).
+# 검색 API 사용량을 줄이기 위해 최근 active_window 안에 요청된 조합만 주기적으로 갱신합니다.
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class NewsReportScheduler:
+    # store: DiskCache 호환 저장소 (get/set, 없으면 MISS)
+    # build: (domain, period) -> {'articles': [...], 'report': str} (실패 시 예외)
+    # intervals: 조회 기간별 갱신 주기 (초)
+    # retry_delay: 갱신 실패 후 다시 시도하기까지 최소 대기 시간 (초)
+    # active_window: 마지막 요청 후 이 시간이 지난 조합은 갱신하지 않음 (초, None이면 모든 조합 갱신)
+    # max_stale_factor: 갱신 주기의 이 배수보다 오래된 결과는 반환하지 않음 (검색 시 직접 다시 검색)
+    def __init__(self, store, build, domains, intervals, tick=30, max_workers=2, retry_delay=300, active_window=None,
+                 max_stale_factor=2, miss=None):
+        self.store = store
+        self.build = build
+        self.domains = list(domains)
+        self.intervals = dict(intervals)
+        self.tick = tick
+        self.retry_delay = retry_delay
+        self.active_window = active_window
+        self.max_stale_factor = max_stale_factor
+        self.miss = miss
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="news-precompute")
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._retry_at = {}
+        self._requested_at = {}
+        self._started = False
+        self.refreshes = 0
+        self.failures = 0
+
+    @staticmethod
+    def key(domain, period):
+        return json.dumps([domain, period], ensure_ascii=False)
+
+    # 저장된 결과와 갱신 필요 여부 반환 (없거나 너무 오래되었으면 (None, True))
+    def get(self, domain, period):
+        record = self.store.get(self.key(domain, period))
+        if record is self.miss or record is None:
+            return None, True
+        age = time.time() - record['refreshed_at']
+        if age >= self.intervals[period] * self.max_stale_factor:
+            return None, True
+        return record, age >= self.intervals[period]
+
+    # 사용자가 조합을 조회했음을 기록 (주기적 갱신 대상 판단에 사용)
+    def touch(self, domain, period):
+        with self._lock:
+            self._requested_at[self.key(domain, period)] = time.time()
+
+    # 주기적으로 갱신할 조합인지 (최근에 요청되었고 실패 후 대기 중이 아님)
+    def _due(self, key, now):
+        with self._lock:
+            if self._retry_at.get(key, 0) > now:
+                return False
+            if self.active_window is None:
+                return True
+            return now - self._requested_at.get(key, float('-inf')) <= self.active_window
+
+    # 갱신 요청 (사전 계산을 시작하지 않았거나 이미 갱신 중이면 무시)
+    def request(self, domain, period):
+        key = self.key(domain, period)
+        with self._lock:
+            if not self._started or key in self._in_flight:
+                return False
+            self._in_flight.add(key)
+        self._executor.submit(self._refresh, key, domain, period)
+        return True
+
+    def _refresh(self, key, domain, period):
+        try:
+            record = self.build(domain, period)
+            record['refreshed_at'] = time.time()
+            self.store.set(key, record)
+            with self._lock:
+                self.refreshes += 1
+                self._retry_at.pop(key, None)
+        except Exception:
+            # 실패하면 기존 결과를 유지하고 잠시 후 다시 시도
+            with self._lock:
+                self.failures += 1
+                self._retry_at[key] = time.time() + min(self.retry_delay, self.intervals[period])
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    # 갱신 주기가 지난 조합을 찾아 갱신 요청하는 백그라운드 스레드 시작
+    def start(self):
+        with self._lock:
+            self._started = True
+
+        def run():
+            while True:
+                for period in self.intervals:
+                    for domain in self.domains:
+                        if not self._due(self.key(domain, period), time.time()):
+                            continue
+                        _, stale = self.get(domain, period)
+                        if stale:
+                            self.request(domain, period)
+                time.sleep(self.tick)
+
+        thread = threading.Thread(target=run, name="news-scheduler", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        with self._lock:
+            return {'refreshes': self.refreshes, 'failures': self.failures, 'in_flight': len(self._in_flight)}
@@ -0,0 +1,257 @@
+# 종목 심볼 색인
+# 종목명/별칭(한글 포함) → 티커 조회, 접두어 검색, n-gram 기반 오타 허용 검색을 로컬에서 수행합니다.
+# 티커 조회는 정확히 일치하는 경우만 사용하고, 오타 허용 검색 결과는 사용자가 고를 추천 후보로만 제공합니다.
+# Yahoo 검색으로 새로 찾은 종목은 색인에 추가되고 파일에 저장되어 다음 조회부터 로컬에서 처리됩니다.
+# 저장 파일은 한 줄에 한 종목씩 덧붙이기만 하므로 여러 프로세스(Streamlit, jobs.py)가 함께 써도 서로의 종목을 지우지 않습니다.
+import bisect
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+# 기본 종목 목록: (티커, 종목명, 별칭)
+SEED_SYMBOLS = [
+    # 미국
+    ("AAPL", "Apple Inc.", ["애플"]),
+    ("MSFT", "Microsoft Corporation", ["마이크로소프트", "마소"]),
+    ("AMZN", "Amazon.com Inc.", ["아마존", "Amazon"]),
+    ("GOOGL", "Alphabet Inc.", ["알파벳", "구글", "Google"]),
+    ("META", "Meta Platforms, Inc.", ["메타", "페이스북", "Facebook"]),
+    ("TSLA", "Tesla, Inc.", ["테슬라"]),
+    ("NVDA", "NVIDIA Corporation", ["엔비디아"]),
+    ("JPM", "JPMorgan Chase & Co.", ["JP모건", "제이피모건"]),
+    ("JNJ", "Johnson & Johnson", ["존슨앤드존슨", "존슨앤존슨"]),
+    ("V", "Visa Inc.", ["비자"]),
+    ("O", "Realty Income Corporation", ["리얼티인컴"]),
+    ("SBUX", "Starbucks Corporation", ["스타벅스"]),
+    ("MCD", "McDonald's Corporation", ["맥도날드"]),
+    ("NFLX", "Netflix, Inc.", ["넷플릭스"]),
+    ("AMD", "Advanced Micro Devices, Inc.", ["AMD", "에이엠디"]),
+    ("INTC", "Intel Corporation", ["인텔"]),
+    ("AVGO", "Broadcom Inc.", ["브로드컴"]),
+    ("QCOM", "QUALCOMM Incorporated", ["퀄컴"]),
+    ("TSM", "Taiwan Semiconductor Manufacturing Company Limited", ["TSMC", "티에스엠씨", "대만반도체"]),
+    ("ASML", "ASML Holding N.V.", ["에이에스엠엘"]),
+    ("ORCL", "Oracle Corporation", ["오라클"]),
+    ("CRM", "Salesforce, Inc.", ["세일즈포스"]),
+    ("ADBE", "Adobe Inc.", ["어도비"]),
+    ("PLTR", "Palantir Technologies Inc.", ["팔란티어"]),
+    ("COIN", "Coinbase Global, Inc.", ["코인베이스"]),
+    ("BRK-B", "Berkshire Hathaway Inc.", ["버크셔해서웨이", "버크셔"]),
+    ("KO", "The Coca-Cola Company", ["코카콜라"]),
+    ("PEP", "PepsiCo, Inc.", ["펩시코", "펩시"]),
+    ("WMT", "Walmart Inc.", ["월마트"]),
+    ("COST", "Costco Wholesale Corporation", ["코스트코"]),
+    ("DIS", "The Walt Disney Company", ["디즈니", "월트디즈니"]),
+    ("NKE", "NIKE, Inc.", ["나이키"]),
+    ("XOM", "Exxon Mobil Corporation", ["엑슨모빌"]),
+    ("CVX", "Chevron Corporation", ["쉐브론"]),
+    ("PFE", "Pfizer Inc.", ["화이자"]),
+    ("LLY", "Eli Lilly and Company", ["일라이릴리", "릴리"]),
+    ("UNH", "UnitedHealth Group Incorporated", ["유나이티드헬스"]),
+    ("PG", "The Procter & Gamble Company", ["프록터앤드갬블", "P&G"]),
+    ("MA", "Mastercard Incorporated", ["마스터카드"]),
+    ("BAC", "Bank of America Corporation", ["뱅크오브아메리카", "BOA"]),
+    ("GS", "The Goldman Sachs Group, Inc.", ["골드만삭스"]),
+    ("BA", "The Boeing Company", ["보잉"]),
+    # 한국 (KRX)
+    ("005930.KS", "Samsung Electronics Co., Ltd.", ["삼성전자"]),
+    ("000660.KS", "SK hynix Inc.", ["SK하이닉스", "하이닉스"]),
+    ("373220.KS", "LG Energy Solution, Ltd.", ["LG에너지솔루션", "엘지에너지솔루션", "LG엔솔"]),
+    ("207940.KS", "Samsung Biologics Co., Ltd.", ["삼성바이오로직스"]),
+    ("005380.KS", "Hyundai Motor Company", ["현대차", "현대자동차"]),
+    ("000270.KS", "Kia Corporation", ["기아", "기아차"]),
+    ("068270.KS", "Celltrion, Inc.", ["셀트리온"]),
+    ("035420.KS", "NAVER Corporation", ["네이버", "NAVER"]),
+    ("035720.KS", "Kakao Corp.", ["카카오"]),
+    ("005490.KS", "POSCO Holdings Inc.", ["POSCO홀딩스", "포스코홀딩스", "포스코"]),
+    ("051910.KS", "LG Chem, Ltd.", ["LG화학", "엘지화학"]),
+    ("006400.KS", "Samsung SDI Co., Ltd.", ["삼성SDI"]),
+    ("105560.KS", "KB Financial Group Inc.", ["KB금융", "KB금융지주"]),
+    ("055550.KS", "Shinhan Financial Group Co., Ltd.", ["신한지주", "신한금융지주"]),
+    ("086790.KS", "Hana Financial Group Inc.", ["하나금융지주", "하나금융"]),
+    ("012330.KS", "Hyundai Mobis Co., Ltd.", ["현대모비스"]),
+    ("028260.KS", "Samsung C&T Corporation", ["삼성물산"]),
+    ("066570.KS", "LG Electronics Inc.", ["LG전자", "엘지전자"]),
+    ("096770.KS", "SK Innovation Co., Ltd.", ["SK이노베이션"]),
+    ("017670.KS", "SK Telecom Co., Ltd.", ["SK텔레콤"]),
+    ("030200.KS", "KT Corporation", ["KT", "케이티"]),
+    ("032830.KS", "Samsung Life Insurance Co., Ltd.", ["삼성생명"]),
+    ("015760.KS", "Korea Electric Power Corporation", ["한국전력", "한전"]),
+    ("323410.KS", "KakaoBank Corp.", ["카카오뱅크"]),
+    ("259960.KS", "Krafton, Inc.", ["크래프톤"]),
+    ("036570.KS", "NCSoft Corporation", ["엔씨소프트"]),
+    ("011200.KS", "HMM Co., Ltd.", ["HMM"]),
+    ("003490.KS", "Korean Air Lines Co., Ltd.", ["대한항공"]),
+    ("034020.KS", "Doosan Enerbility Co., Ltd.", ["두산에너빌리티"]),
+    ("012450.KS", "Hanwha Aerospace Co., Ltd.", ["한화에어로스페이스"]),
+    ("009150.KS", "Samsung Electro-Mechanics Co., Ltd.", ["삼성전기"]),
+    ("003670.KS", "POSCO Future M Co., Ltd.", ["포스코퓨처엠"]),
+    ("010130.KS", "Korea Zinc Company, Ltd.", ["고려아연"]),
+    ("042700.KS", "Hanmi Semiconductor Co., Ltd.", ["한미반도체"]),
+    ("247540.KQ", "EcoPro BM Co., Ltd.", ["에코프로비엠"]),
+    ("086520.KQ", "EcoPro Co., Ltd.", ["에코프로"]),
+    ("196170.KQ", "Alteogen Inc.", ["알테오젠"]),
+    ("028300.KQ", "HLB Co., Ltd.", ["HLB", "에이치엘비"]),
+    ("058470.KQ", "LEENO Industrial Inc.", ["리노공업"]),
+]
+
+# 정규화 시 제거할 법인 형태 표기
+CORPORATE_SUFFIXES = re.compile(
+    r"\b(incorporated|inc|corporation|corp|company|co|ltd|limited|plc|n\.?v|s\.?a|ag)\b\.?|\(주\)|주식회사"
+)
+
+# 종목 코드 형태 (숫자 코드, 거래소 접미사가 붙은 티커, 지수, 환율/선물, 예: 005930, 005930.KS, 7203.T, ^GSPC, EURUSD=X)
+CODE_PATTERN = re.compile(
+    r"\^[0-9A-Za-z\-=.]+"
+    r"|[0-9A-Za-z\-]+=[A-Za-z]"
+    r"|[0-9A-Za-z\-=]+\.[A-Za-z]{1,3}"
+    r"|[0-9A-Za-z\-=]*\d[0-9A-Za-z\-=]*"
+)
+
+# 편집 거리로 다시 순위를 매길 bigram 후보 수
+RERANK_CANDIDATES = 10
+
+
+# 비교용 문자열 정규화 (소문자, 법인 형태/공백/기호 제거)
+def normalize(text):
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = CORPORATE_SUFFIXES.sub(" ", text)
+    return re.sub(r"[^0-9a-z가-힣]", "", text)
+
+
+# 종목 코드 형태인지 확인 (코드는 한 글자만 달라도 다른 종목이므로 유사도로 찾지 않음)
+def looks_like_code(text):
+    return CODE_PATTERN.fullmatch(text.strip()) is not None
+
+
+# 문자 bigram 집합 (한 글자는 그대로 사용)
+def ngrams(text):
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+# 자모 단위 편집 거리 기반 유사도 (한글은 NFD로 자모 분해하여 한 글자 오타를 작게 반영)
+def edit_similarity(a, b):
+    a = unicodedata.normalize("NFD", a)
+    b = unicodedata.normalize("NFD", b)
+    if not a or not b:
+        return 0.0
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return 1 - previous[-1] / max(len(a), len(b))
+
+
+class SymbolIndex:
+    # path: Yahoo 검색으로 추가된 종목을 저장할 JSONL 파일 (None이면 저장하지 않음)
+    def __init__(self, entries=SEED_SYMBOLS, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._names = {}                  # 티커 → 종목명
+        self._aliases = {}                # 정규화된 별칭 → 티커
+        self._sorted_aliases = []         # 접두어 검색용 정렬 목록
+        self._postings = defaultdict(set) # bigram → 정규화된 별칭
+        for symbol, name, aliases in entries:
+            self._add(symbol, name, aliases)
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    # 쓰다가 중단된 줄은 건너뜀
+                    try:
+                        symbol, name, aliases = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._add(symbol, name, aliases)
+
+    # 잠금 상태 또는 초기화 중에 호출
+    def _add(self, symbol, name, aliases):
+        self._names.setdefault(symbol, name)
+        keys = [symbol, name, *aliases]
+        # KRX 종목은 숫자 코드만으로도 조회 가능하도록 추가
+        if re.fullmatch(r"\d{6}\.(KS|KQ)", symbol):
+            keys.append(symbol.split(".")[0])
+        for key in keys:
+            alias = normalize(key)
+            if not alias or alias in self._aliases:
+                continue
+            self._aliases[alias] = symbol
+            bisect.insort(self._sorted_aliases, alias)
+            for gram in ngrams(alias):
+                self._postings[gram].add(alias)
+
+    # 새 종목 또는 별칭 추가 (path가 있으면 파일 끝에 한 줄 덧붙여 저장)
+    def add(self, symbol, name=None, aliases=()):
+        line = json.dumps([symbol, name or symbol, list(aliases)], ensure_ascii=False) + "\n"
+        with self._lock:
+            self._add(symbol, name or symbol, list(aliases))
+            if self.path:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # 한 번의 write로 덧붙여 다른 프로세스가 쓴 줄과 섞이지 않도록 함
+                # (쓰다가 중단된 줄이 끝에 있으면 새 줄에서 시작)
+                with open(self.path, "ab") as f:
+                    if f.tell() > 0:
+                        with open(self.path, "rb") as reader:
+                            reader.seek(-1, os.SEEK_END)
+                            if reader.read(1) != b"\n":
+                                line = "\n" + line
+                    f.write(line.encode("utf-8"))
+
+    def name(self, symbol):
+        return self._names.get(symbol)
+
+    # 종목명/별칭/티커로 티커 조회 (정확히 일치하는 경우만, 없으면 None)
+    # 비슷한 이름의 다른 종목(카카오페이 → 카카오 등)을 고르지 않도록 유사도 검색은 사용하지 않음
+    def lookup(self, query):
+        alias = normalize(query)
+        with self._lock:
+            return self._aliases.get(alias)
+
+    # 자동완성 후보 검색 (정확 일치 > 접두어 일치 > bigram 유사도 순)
+    def search(self, query, limit=10):
+        alias = normalize(query)
+        if not alias:
+            return []
+        scores = {}
+        with self._lock:
+            # 접두어 일치
+            start = bisect.bisect_left(self._sorted_aliases, alias)
+            for candidate in self._sorted_aliases[start:start + limit * 5]:
+                if not candidate.startswith(alias):
+                    break
+                score = 1.0 if candidate == alias else 0.9 + 0.1 * len(alias) / len(candidate)
+                self._merge_score(scores, candidate, score)
+
+            # bigram 유사도(Dice 계수)로 후보를 고른 뒤 자모 편집 거리와 함께 점수 계산
+            query_grams = ngrams(alias)
+            overlaps = Counter()
+            for gram in query_grams:
+                overlaps.update(self._postings.get(gram, ()))
+            dice_scores = {
+                candidate: 2 * overlap / (len(query_grams) + len(ngrams(candidate)))
+                for candidate, overlap in overlaps.items()
+            }
+            candidates = sorted(dice_scores, key=lambda c: -dice_scores[c])[:max(RERANK_CANDIDATES, limit)]
+            for candidate in candidates:
+                score = 0.9 * (dice_scores[candidate] + edit_similarity(alias, candidate)) / 2
+                self._merge_score(scores, candidate, score)
+
+            ranked = sorted(scores.items(), key=lambda item: -item[1])[:limit]
+            return [
+                {"symbol": symbol, "name": self._names[symbol], "score": round(score, 3)}
+                for symbol, score in ranked
+            ]
+
+    # 티커별 최고 점수 유지 (잠금 상태에서 호출)
+    def _merge_score(self, scores, alias, score):
+        symbol = self._aliases[alias]
+        if score > scores.get(symbol, 0):
+            scores[symbol] = score
@@ -0,0 +1,137 @@
+# 구간별 지연 시간/비용 계측 모듈
+# 외부 I/O(Serp API, YouTube, 자막, yfinance, Gemini 등)를 span으로 감싸 소요 시간과 속성을 기록하고,
+# 구간별로 최근 지연 시간 분포(p50/p95/p99)와 속성 합계를 집계해 JSON/Prometheus 텍스트로 내보냅니다.
+#
+# span 속성 집계 규칙
+# - 숫자 값(payload_bytes, prompt_tokens 등)은 합계로 집계
+# - 문자열 값(cache='hit', key='key1' 등)은 값별 횟수로 집계
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Span:
+    def __init__(self, stage, attrs):
+        self.stage = stage
+        self.attrs = dict(attrs)
+
+    # 실행 도중 알게 된 속성 추가 (응답 크기, 토큰 수, 캐시 적중 여부 등)
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    # window: 구간별로 분포 계산에 사용할 최근 span 수
+    def __init__(self, window=1000, recent=200):
+        self._lock = threading.Lock()
+        self._durations = defaultdict(lambda: deque(maxlen=window))
+        self._stages = defaultdict(lambda: {'count': 0, 'errors': 0, 'seconds': 0.0, 'totals': defaultdict(float), 'labels': defaultdict(int)})
+        self._recent = deque(maxlen=recent)
+
+    @contextmanager
+    def span(self, stage, **attrs):
+        span = Span(stage, attrs)
+        started = time.perf_counter()
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self._record(span, time.perf_counter() - started, error)
+
+    def _record(self, span, elapsed, error):
+        with self._lock:
+            self._durations[span.stage].append(elapsed)
+            stage = self._stages[span.stage]
+            stage['count'] += 1
+            stage['seconds'] += elapsed
+            if error:
+                stage['errors'] += 1
+            for name, value in span.attrs.items():
+                if isinstance(value, bool) or value is None:
+                    continue
+                if isinstance(value, (int, float)):
+                    stage['totals'][name] += value
+                else:
+                    stage['labels'][(name, str(value))] += 1
+            self._recent.append({
+                'stage': span.stage,
+                'started_at': time.time() - elapsed,
+                'duration_ms': round(elapsed * 1000, 1),
+                'error': error,
+                **span.attrs,
+            })
+
+    # 구간별 요청 수, 오류율, 지연 시간 분위수(ms), 속성 합계/값별 횟수
+    def stats(self):
+        with self._lock:
+            stats = {}
+            for name, stage in self._stages.items():
+                durations = sorted(self._durations[name])
+                entry = {
+                    'count': stage['count'],
+                    'errors': stage['errors'],
+                    'error_rate': round(stage['errors'] / stage['count'], 4),
+                    'mean_ms': round(stage['seconds'] / stage['count'] * 1000, 1),
+                }
+                for q in QUANTILES:
+                    entry[f'p{int(q * 100)}_ms'] = round(durations[min(int(len(durations) * q), len(durations) - 1)] * 1000, 1)
+                entry.update({attr: round(total, 3) for attr, total in stage['totals'].items()})
+                entry.update({f'{attr}={value}': count for (attr, value), count in stage['labels'].items()})
+                stats[name] = entry
+            return stats
+
+    def recent(self):
+        with self._lock:
+            return list(self._recent)
+
+    def to_json(self):
+        return json.dumps(self.stats(), ensure_ascii=False, indent=2)
+
+    # Prometheus 텍스트 형식 (분위수는 최근 window 기준 summary)
+    def to_prometheus(self, prefix="aisenet"):
+        with self._lock:
+            stages = {
+                name: (sorted(self._durations[name]), stage['count'], stage['seconds'], stage['errors'],
+                       dict(stage['totals']), dict(stage['labels']))
+                for name, stage in self._stages.items()
+            }
+        lines = [f"# TYPE {prefix}_stage_duration_seconds summary"]
+        for name, (durations, count, seconds, _, _, _) in stages.items():
+            for q in QUANTILES:
+                value = durations[min(int(len(durations) * q), len(durations) - 1)]
+                lines.append(f'{prefix}_stage_duration_seconds{{stage="{name}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{prefix}_stage_duration_seconds_count{{stage="{name}"}} {count}')
+            lines.append(f'{prefix}_stage_duration_seconds_sum{{stage="{name}"}} {seconds:.6f}')
+        lines.append(f"# TYPE {prefix}_stage_errors_total counter")
+        for name, (_, _, _, errors, _, _) in stages.items():
+            lines.append(f'{prefix}_stage_errors_total{{stage="{name}"}} {errors}')
+        lines.append(f"# TYPE {prefix}_stage_attribute_total counter")
+        for name, (_, _, _, _, totals, _) in stages.items():
+            for attr, total in totals.items():
+                lines.append(f'{prefix}_stage_attribute_total{{stage="{name}",attribute="{attr}"}} {total:g}')
+        lines.append(f"# TYPE {prefix}_stage_label_total counter")
+        for name, (_, _, _, _, _, labels) in stages.items():
+            for (attr, value), count in labels.items():
+                value = value.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{prefix}_stage_label_total{{stage="{name}",attribute="{attr}",value="{value}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# 키 값 대신 순번으로 표시 (key1, key2, ...)
+def key_label(keys, key):
+    try:
+        return f"key{list(keys).index(key) + 1}"
+    except ValueError:
+        return "unknown"
+
+
+# 프로세스 공용 tracer (모든 모듈이 같은 집계를 사용)
+TRACER = Tracer()
+span = TRACER.span
@@ -0,0 +1,124 @@
+# 자막 조회 모듈
+# youtube-transcript-api와 Apify를 경쟁시켜(hedging) 먼저 도착한 자막을 사용하고,
+# 전체 조회 시간에 상한을 둡니다.
+import queue
+import threading
+import time
+
+from tracing import span
+
+APIFY_TRANSCRIPT_ACTOR = "topaz_sharingan/Youtube-Transcript-Scraper-1"
+
+# Apify 실행 종료 상태
+APIFY_TERMINAL_STATUSES = ("SUCCEEDED", "FAILED", "TIMED-OUT", "ABORTED")
+
+# 조회 결과 상태
+FOUND = "found"          # 자막 있음
+NOT_FOUND = "not_found"  # 해당 경로에 자막 없음 (확정)
+FAILED = "failed"        # 오류 또는 시간 초과 (자막 유무 불확실)
+
+
+class TranscriptResolver:
+    # hedge_delay: 직접 조회 시작 후 Apify 실행을 시작하기까지 대기 시간 (0이면 동시에 시작)
+    # deadline: 전체 조회 시간 상한 (초)
+    def __init__(self, apify_client, hedge_delay=3.0, deadline=60.0, poll_interval=2.0, actor_id=APIFY_TRANSCRIPT_ACTOR):
+        self.apify_client = apify_client
+        self.hedge_delay = hedge_delay
+        self.deadline = deadline
+        self.poll_interval = poll_interval
+        self.actor_id = actor_id
+
+    # (상태, 자막) 반환. 두 경로 모두 자막 없음을 확인한 경우에만 NOT_FOUND
+    def resolve(self, video_id, languages=('ko', 'en')):
+        results = queue.Queue()
+        cancel = threading.Event()
+        deadline = time.monotonic() + self.deadline
+        hedge_at = time.monotonic() + self.hedge_delay
+
+        self._spawn(self._fetch_direct, video_id, languages, results)
+        pending = {"direct"}
+        outcomes = {}
+        apify_started = False
+
+        try:
+            while pending or not apify_started:
+                now = time.monotonic()
+                if now >= deadline:
+                    return FAILED, None
+
+                # 지연 시간이 지났거나 직접 조회가 실패하면 Apify 실행 시작
+                if not apify_started and (now >= hedge_at or "direct" in outcomes):
+                    self._spawn(self._fetch_apify, video_id, results, cancel, deadline)
+                    pending.add("apify")
+                    apify_started = True
+
+                wait_until = deadline if apify_started else min(deadline, hedge_at)
+                try:
+                    source, status, transcript = results.get(timeout=max(wait_until - now, 0))
+                except queue.Empty:
+                    continue
+
+                pending.discard(source)
+                outcomes[source] = status
+                if status == FOUND:
+                    return FOUND, transcript
+        finally:
+            # 남은 Apify 실행 중단 (직접 조회 스레드는 결과를 버림)
+            cancel.set()
+
+        if all(status == NOT_FOUND for status in outcomes.values()):
+            return NOT_FOUND, None
+        return FAILED, None
+
+    @staticmethod
+    def _spawn(target, *args):
+        threading.Thread(target=target, args=args, daemon=True).start()
+
+    # youtube-transcript-api로 자막 조회
+    def _fetch_direct(self, video_id, languages, results):
+        try:
+            # 자막을 처음 조회할 때 불러옴 (뉴스/재무정보만 사용하는 경우 불러오지 않음)
+            from youtube_transcript_api import YouTubeTranscriptApi
+            from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
+            with span("transcript.direct") as s:
+                try:
+                    transcript_list = YouTubeTranscriptApi.get_transcript(video_id, languages=list(languages))
+                except (TranscriptsDisabled, NoTranscriptFound):
+                    s.set(status=NOT_FOUND)
+                    results.put(("direct", NOT_FOUND, None))
+                    return
+                transcript = ' '.join([entry['text'] for entry in transcript_list])
+                s.set(status=FOUND, payload_bytes=len(transcript.encode('utf-8')))
+            results.put(("direct", FOUND, transcript))
+        except Exception:
+            results.put(("direct", FAILED, None))
+
+    # Apify 실행을 시작하고 종료될 때까지 상태 확인 (취소/시간 초과 시 실행 중단)
+    def _fetch_apify(self, video_id, results, cancel, deadline):
+        try:
+            with span("transcript.apify") as s:
+                status, transcript = self._run_apify(video_id, cancel, deadline)
+                s.set(status=status or "cancelled", payload_bytes=len(transcript.encode('utf-8')) if transcript else 0)
+            if status is not None:
+                results.put(("apify", status, transcript))
+        except Exception:
+            results.put(("apify", FAILED, None))
+
+    # Apify 실행 결과 (상태, 자막), 취소/시간 초과로 중단하면 (None, None)
+    def _run_apify(self, video_id, cancel, deadline):
+        run_input = {"startUrls": [f"https://www.youtube.com/watch?v={video_id}"]}
+        run = self.apify_client.actor(self.actor_id).start(run_input=run_input)
+        run_client = self.apify_client.run(run["id"])
+        while run["status"] not in APIFY_TERMINAL_STATUSES:
+            if cancel.is_set() or time.monotonic() >= deadline:
+                run_client.abort()
+                return None, None
+            time.sleep(self.poll_interval)
+            run = run_client.get()
+
+        if run["status"] != "SUCCEEDED":
+            return FAILED, None
+        for item in self.apify_client.dataset(run["defaultDatasetId"]).iterate_items():
+            if item.get("transcript"):
+                return FOUND, item["transcript"]
+        return NOT_FOUND, None
@@ -0,0 +1,122 @@
+# YouTube Data API 클라이언트 풀
+# API 키별 클라이언트를 한 번만 생성해 재사용하고, 키별 할당량 사용량을 추적해
+# 남은 할당량이 가장 많은 키로 요청을 보냅니다.
+import json
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from tracing import span, key_label
+
+# 요청 종류별 할당량 비용 (YouTube Data API v3 기준)
+QUOTA_COSTS = {
+    "search": 100,
+    "videos": 1,
+    "commentThreads": 1,
+}
+
+# 키당 일일 기본 할당량
+DEFAULT_DAILY_QUOTA = 10000
+
+# 할당량은 태평양 시간 자정에 초기화됨
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+QUOTA_ERROR_REASONS = (b"quotaExceeded", b"dailyLimitExceeded")
+
+
+# 사용 가능한 키가 없을 때 발생
+class QuotaExceededError(Exception):
+    pass
+
+
+class YouTubeClientPool:
+    def __init__(self, api_keys, daily_quota=DEFAULT_DAILY_QUOTA):
+        self.api_keys = list(api_keys)
+        self.daily_quota = daily_quota
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._local = threading.local()
+        self._quota_day = self._today()
+        self._used = {key: 0 for key in self.api_keys}
+        self._tripped = set()
+
+    @staticmethod
+    def _today():
+        return datetime.now(QUOTA_TIMEZONE).date()
+
+    # 날짜가 바뀌면 사용량과 차단 상태 초기화 (잠금 상태에서 호출)
+    def _roll_quota_day(self):
+        today = self._today()
+        if today != self._quota_day:
+            self._quota_day = today
+            self._used = {key: 0 for key in self.api_keys}
+            self._tripped.clear()
+
+    # 남은 할당량이 가장 많은 키를 고르고 비용을 미리 차감
+    def _acquire_key(self, cost, exclude):
+        with self._lock:
+            self._roll_quota_day()
+            candidates = [key for key in self.api_keys if key not in self._tripped and key not in exclude]
+            if not candidates:
+                raise QuotaExceededError("사용 가능한 YouTube API 키가 없습니다. (모든 키의 할당량 소진)")
+            key = min(candidates, key=lambda k: self._used[k])
+            self._used[key] += cost
+            return key
+
+    def _trip(self, key):
+        with self._lock:
+            self._tripped.add(key)
+            self._used[key] = max(self._used[key], self.daily_quota)
+
+    # 키별 클라이언트 (디스커버리 문서 파싱은 키당 한 번만 수행)
+    def _client(self, key):
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                # googleapiclient는 불러오는 데 시간이 걸리므로 YouTube를 처음 사용할 때 불러옴
+                from googleapiclient.discovery import build
+                with span("youtube.build", key=key_label(self.api_keys, key)):
+                    client = build('youtube', 'v3', developerKey=key, cache_discovery=False)
+                self._clients[key] = client
+            return client
+
+    # httplib2는 스레드 안전하지 않으므로 스레드별 HTTP 연결을 재사용
+    def _http(self):
+        http = getattr(self._local, "http", None)
+        if http is None:
+            from googleapiclient.http import build_http
+            http = build_http()
+            self._local.http = http
+        return http
+
+    # request_factory(youtube)가 만든 요청을 실행. 할당량 초과 키는 차단하고 다른 키로 재시도
+    # operation: 계측 구간 이름 (youtube.<operation>)
+    def execute(self, request_factory, cost, operation="request"):
+        from googleapiclient.errors import HttpError
+        tried = set()
+        while True:
+            key = self._acquire_key(cost, tried)
+            tried.add(key)
+            try:
+                with span(f"youtube.{operation}", key=key_label(self.api_keys, key), quota_cost=cost) as s:
+                    response = request_factory(self._client(key)).execute(http=self._http())
+                    s.set(payload_bytes=len(json.dumps(response, ensure_ascii=False).encode("utf-8")))
+                return response
+            except HttpError as e:
+                if e.resp.status == 403 and any(reason in e.content for reason in QUOTA_ERROR_REASONS):
+                    self._trip(key)
+                    continue
+                raise
+
+    # 키별 사용량 (키 값은 노출하지 않음)
+    def stats(self):
+        with self._lock:
+            self._roll_quota_day()
+            return {
+                f"key{i + 1}": {
+                    "used": self._used[key],
+                    "remaining": max(self.daily_quota - self._used[key], 0),
+                    "tripped": key in self._tripped,
+                }
+                for i, key in enumerate(self.api_keys)
+            }